@@ -3,8 +3,10 @@
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
+from app.core.hashing import compute_image_hash
 from app.jobs.models import (
     CAMInfo,
     ChannelInfo,
@@ -30,6 +32,20 @@ from app.models.registry import get_model_config, list_models
 router = APIRouter()
 
 
+def validate_image_upload(image: UploadFile) -> None:
+    """
+    Check that an uploaded file is declared as an image.
+
+    Args:
+        image: Uploaded file
+
+    Raises:
+        HTTPException: 400 if the content type is missing or not image/*
+    """
+    if not image.content_type or not image.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+
 @router.post("/jobs", response_model=JobRecord)
 async def create_job(
     image: UploadFile = File(...),
@@ -50,8 +66,7 @@ async def create_job(
         JobRecord with job_id and status
     """
     # Validate image file
-    if not image.content_type or not image.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="File must be an image")
+    validate_image_upload(image)
 
     # Validate model_id exists in registry
     model_config = get_model_config(model_id)
@@ -85,7 +100,7 @@ async def create_job(
     # Parse and validate cam_layers
     if cam_layers is None:
         # Use model-specific defaults from registry
-        cam_layers_list = get_default_cam_layers(model_id)
+        cam_layers_list = list(get_default_cam_layers(model_id))
         if not cam_layers_list:
             raise HTTPException(status_code=400, detail=f"No default CAM layers found for model '{model_id}'")
     else:
@@ -93,8 +108,13 @@ async def create_job(
         if not cam_layers_list:
             raise HTTPException(status_code=400, detail="cam_layers must contain at least one layer")
 
+    # Hash the upload once; the result cache and preprocessing cache both key on it
+    image_hash = compute_image_hash(image_bytes)
+
     # Create job
-    job_id = await job_service.create_job(model_id, image_bytes, top_k=top_k, cam_layers=cam_layers_list)
+    job_id = await job_service.create_job(
+        model_id, image_bytes, top_k=top_k, cam_layers=cam_layers_list, image_hash=image_hash
+    )
 
     # Return job record
     job = await job_service.get_job(job_id)
@@ -187,6 +207,7 @@ async def get_job_status(job_id: str):
             ChannelInfo(
                 channel=ch["channel"],
                 mean=ch["mean"],
+                min=ch.get("min"),
                 max=ch["max"],
                 image_url=ch["image_url"],
             )
@@ -271,6 +292,36 @@ async def get_job_status(job_id: str):
     return response
 
 
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream job status updates as Server-Sent Events.
+
+    Sends one event per status/progress change (the JobRecord without its result)
+    and closes the stream once the job has succeeded or failed; fetch the full
+    result from GET /jobs/{job_id} afterwards.
+
+    Args:
+        job_id: Unique job identifier
+
+    Returns:
+        text/event-stream response
+    """
+    if await job_service.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    async def event_stream():
+        async for job in job_service.watch_job(job_id):
+            yield f"data: {job.model_dump_json(exclude={'result'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events are delivered as they happen
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -311,5 +362,5 @@ async def get_model(model_id: str):
     model_config = get_model_config(model_id)
     if model_config is None:
         raise HTTPException(status_code=404, detail=f"Model '{model_id}' not found")
-    return model_config
+    return dict(model_config)
 
@@ -19,6 +19,7 @@ class Settings(BaseSettings):
 
     # Storage Configuration
     STORAGE_DIR: Path = Path("./storage")
+    PNG_COMPRESS_LEVEL: int = 1  # zlib level for generated PNGs (0-9; 1 = fastest encode, 6 = Pillow default)
 
     # Model Registry
     MODEL_REGISTRY_PATH: Path = Path(__file__).parent.parent.parent / "model_registry.yaml"
@@ -26,14 +27,40 @@ class Settings(BaseSettings):
     # Cache Configuration
     CACHE_ENABLED: bool = True
     CACHE_MAX_ITEMS: int = 100
+    PREPROC_CACHE_MAX: int = 32  # Preprocessed input tensors kept per (image, model) (0 = disabled)
 
     # Model Configuration
     PRELOAD_MODELS: str = ""  # "" = none, "all" = all models, else comma-separated list
     PRELOAD_STRATEGY: str = "download_only"  # "download_only" or "load_into_ram"
+    PRELOAD_WORKERS: int = 4  # Models preloaded concurrently at startup
+    WARMUP_MODELS: bool = True  # Dummy forward pass for each model preloaded into RAM (lazy init, allocator, cuDNN autotune)
     MODEL_CACHE_MAX: int = 3  # Maximum number of models to keep in memory (LRU cache)
+    MODEL_CACHE_MAX_BYTES: int = 0  # Maximum total parameter/buffer bytes of cached models (0 = no byte limit)
+    PINNED_WEIGHT_POOL_MAX: int = 2  # Evicted models kept in pinned host memory for fast reloads (CUDA only, 0 = disabled)
+    PINNED_RING_SIZE: int = 4  # Reusable pinned host buffers for input uploads per input shape (CUDA only)
+    DEVICE: str = "cpu"  # Torch device for inference ("cpu", "cuda", "cuda:0", ...)
+    COMPILE_MODELS: bool = False  # torch.compile the prediction forward pass (slow first call; warm up via PRELOAD_MODELS)
+    COMPILE_MODE: str = "default"  # torch.compile mode ("reduce-overhead" adds CUDA graphs on GPU)
+    CUDA_GRAPHS: bool = False  # Capture prediction forward passes as CUDA graphs (CUDA only, ignored with COMPILE_MODELS)
+    AUTOCAST_DTYPE: str = "none"  # Prediction forward pass precision: "none" (FP32), "float16" or "bfloat16"
+    INFERENCE_BATCH_WINDOW_MS: float = 0  # How long the batcher waits for concurrent jobs to join a batch
+    INFERENCE_MAX_BATCH: int = 8  # Maximum images per batched forward pass
+    EXPORT_MODELS: bool = False  # AOT-compile the prediction forward pass (torch.export + AOTInductor), cached on disk
+    EXPORTED_MODELS_DIR: Path = Path(".cache/exported")  # Where exported model packages are stored
     # Default under app root so Docker/non-root deploys can write without a host /data mount
     TORCH_HOME: Path = Path(".cache/torch")
 
+    # Job Worker Configuration
+    WORKER_CONCURRENCY: int = 2  # Jobs processed concurrently per process (lets INFERENCE_BATCH_WINDOW_MS form batches)
+
+    # Job Store Configuration
+    JOB_STORE_BACKEND: str = "memory"  # "memory" (single process) or "redis" (shared across replicas)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50  # Connection pool size for the Redis job store
+    REDIS_JOB_TTL_SECONDS: int = 86400  # Expiry of Redis job records (0 = never expire)
+    REDIS_CLAIM_IDLE_SECONDS: float = 600  # Unacked jobs idle this long are reclaimed
+    REDIS_MAX_DELIVERIES: int = 3  # Deliveries after which a reclaimed job is marked failed
+
     # Upload Configuration
     MAX_UPLOAD_SIZE_MB: int = 10
 
@@ -86,6 +113,17 @@ class Settings(BaseSettings):
             v = v.resolve()
         return v
 
+    @field_validator("EXPORTED_MODELS_DIR", mode="after")
+    @classmethod
+    def resolve_exported_models_dir(cls, v: Path) -> Path:
+        """Resolve EXPORTED_MODELS_DIR; relative paths are anchored to the backend project root."""
+        if not v.is_absolute():
+            base_path = Path(__file__).parent.parent.parent
+            v = (base_path / v).resolve()
+        else:
+            v = v.resolve()
+        return v
+
     @field_validator("PRELOAD_STRATEGY", mode="before")
     @classmethod
     def validate_preload_strategy(cls, v: str) -> str:
@@ -95,6 +133,33 @@ class Settings(BaseSettings):
             raise ValueError(f"PRELOAD_STRATEGY must be one of {allowed}, got: {v}")
         return v
 
+    @field_validator("COMPILE_MODE", mode="before")
+    @classmethod
+    def validate_compile_mode(cls, v: str) -> str:
+        """Validate COMPILE_MODE is one of allowed values."""
+        allowed = {"default", "reduce-overhead", "max-autotune", "max-autotune-no-cudagraphs"}
+        if v not in allowed:
+            raise ValueError(f"COMPILE_MODE must be one of {allowed}, got: {v}")
+        return v
+
+    @field_validator("AUTOCAST_DTYPE", mode="before")
+    @classmethod
+    def validate_autocast_dtype(cls, v: str) -> str:
+        """Validate AUTOCAST_DTYPE is one of allowed values."""
+        allowed = {"none", "float16", "bfloat16"}
+        if v not in allowed:
+            raise ValueError(f"AUTOCAST_DTYPE must be one of {allowed}, got: {v}")
+        return v
+
+    @field_validator("JOB_STORE_BACKEND", mode="before")
+    @classmethod
+    def validate_job_store_backend(cls, v: str) -> str:
+        """Validate JOB_STORE_BACKEND is one of allowed values."""
+        allowed = {"memory", "redis"}
+        if v not in allowed:
+            raise ValueError(f"JOB_STORE_BACKEND must be one of {allowed}, got: {v}")
+        return v
+
     @field_validator("MODEL_CACHE_MAX", mode="after")
     @classmethod
     def validate_model_cache_max(cls, v: int) -> int:
@@ -103,6 +168,110 @@ class Settings(BaseSettings):
             raise ValueError("MODEL_CACHE_MAX must be >= 1")
         return v
 
+    @field_validator("PREPROC_CACHE_MAX", mode="after")
+    @classmethod
+    def validate_preproc_cache_max(cls, v: int) -> int:
+        """Validate PREPROC_CACHE_MAX is >= 0."""
+        if v < 0:
+            raise ValueError("PREPROC_CACHE_MAX must be >= 0")
+        return v
+
+    @field_validator("PRELOAD_WORKERS", mode="after")
+    @classmethod
+    def validate_preload_workers(cls, v: int) -> int:
+        """Validate PRELOAD_WORKERS is >= 1."""
+        if v < 1:
+            raise ValueError("PRELOAD_WORKERS must be >= 1")
+        return v
+
+    @field_validator("MODEL_CACHE_MAX_BYTES", mode="after")
+    @classmethod
+    def validate_model_cache_max_bytes(cls, v: int) -> int:
+        """Validate MODEL_CACHE_MAX_BYTES is >= 0."""
+        if v < 0:
+            raise ValueError("MODEL_CACHE_MAX_BYTES must be >= 0")
+        return v
+
+    @field_validator("INFERENCE_BATCH_WINDOW_MS", mode="after")
+    @classmethod
+    def validate_inference_batch_window_ms(cls, v: float) -> float:
+        """Validate INFERENCE_BATCH_WINDOW_MS is >= 0."""
+        if v < 0:
+            raise ValueError("INFERENCE_BATCH_WINDOW_MS must be >= 0")
+        return v
+
+    @field_validator("INFERENCE_MAX_BATCH", mode="after")
+    @classmethod
+    def validate_inference_max_batch(cls, v: int) -> int:
+        """Validate INFERENCE_MAX_BATCH is >= 1."""
+        if v < 1:
+            raise ValueError("INFERENCE_MAX_BATCH must be >= 1")
+        return v
+
+    @field_validator("PINNED_WEIGHT_POOL_MAX", mode="after")
+    @classmethod
+    def validate_pinned_weight_pool_max(cls, v: int) -> int:
+        """Validate PINNED_WEIGHT_POOL_MAX is >= 0."""
+        if v < 0:
+            raise ValueError("PINNED_WEIGHT_POOL_MAX must be >= 0")
+        return v
+
+    @field_validator("REDIS_MAX_CONNECTIONS", mode="after")
+    @classmethod
+    def validate_redis_max_connections(cls, v: int) -> int:
+        """Validate REDIS_MAX_CONNECTIONS is >= 1."""
+        if v < 1:
+            raise ValueError("REDIS_MAX_CONNECTIONS must be >= 1")
+        return v
+
+    @field_validator("REDIS_JOB_TTL_SECONDS", mode="after")
+    @classmethod
+    def validate_redis_job_ttl_seconds(cls, v: int) -> int:
+        """Validate REDIS_JOB_TTL_SECONDS is >= 0."""
+        if v < 0:
+            raise ValueError("REDIS_JOB_TTL_SECONDS must be >= 0")
+        return v
+
+    @field_validator("REDIS_CLAIM_IDLE_SECONDS", mode="after")
+    @classmethod
+    def validate_redis_claim_idle_seconds(cls, v: float) -> float:
+        """Validate REDIS_CLAIM_IDLE_SECONDS is > 0."""
+        if v <= 0:
+            raise ValueError("REDIS_CLAIM_IDLE_SECONDS must be > 0")
+        return v
+
+    @field_validator("REDIS_MAX_DELIVERIES", mode="after")
+    @classmethod
+    def validate_redis_max_deliveries(cls, v: int) -> int:
+        """Validate REDIS_MAX_DELIVERIES is >= 1."""
+        if v < 1:
+            raise ValueError("REDIS_MAX_DELIVERIES must be >= 1")
+        return v
+
+    @field_validator("WORKER_CONCURRENCY", mode="after")
+    @classmethod
+    def validate_worker_concurrency(cls, v: int) -> int:
+        """Validate WORKER_CONCURRENCY is >= 1."""
+        if v < 1:
+            raise ValueError("WORKER_CONCURRENCY must be >= 1")
+        return v
+
+    @field_validator("PINNED_RING_SIZE", mode="after")
+    @classmethod
+    def validate_pinned_ring_size(cls, v: int) -> int:
+        """Validate PINNED_RING_SIZE is >= 1."""
+        if v < 1:
+            raise ValueError("PINNED_RING_SIZE must be >= 1")
+        return v
+
+    @field_validator("PNG_COMPRESS_LEVEL", mode="after")
+    @classmethod
+    def validate_png_compress_level(cls, v: int) -> int:
+        """Validate PNG_COMPRESS_LEVEL is between 0 and 9."""
+        if not 0 <= v <= 9:
+            raise ValueError("PNG_COMPRESS_LEVEL must be between 0 and 9")
+        return v
+
 
 settings = Settings()
 
@@ -0,0 +1,51 @@
+"""Content hashing utilities for uploaded images."""
+
+import hashlib
+from functools import partial
+
+try:
+    from blake3 import blake3 as new_hasher
+except ImportError:
+    # BLAKE2b is in hashlib and still faster than SHA-256 without SHA-NI
+    new_hasher = partial(hashlib.blake2b, digest_size=32)
+
+try:
+    from xxhash import xxh3_128_digest as _xxh3_128_digest
+except ImportError:
+    _xxh3_128_digest = None
+
+# Chunk size for streaming image bytes into the fallback hasher
+_HASH_CHUNK_SIZE = 64 * 1024
+
+
+def image_fingerprint(image_bytes: bytes) -> bytes:
+    """
+    Get a short content fingerprint of image bytes.
+
+    Uses XXH3-128 (16 bytes) when xxhash is installed, otherwise a 32-byte
+    BLAKE3/BLAKE2b digest fed in 64 KiB memoryview slices (zero-copy).
+    """
+    if _xxh3_128_digest is not None:
+        return _xxh3_128_digest(image_bytes)
+
+    hasher = new_hasher()
+    view = memoryview(image_bytes)
+    for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+        hasher.update(view[offset:offset + _HASH_CHUNK_SIZE])
+    return hasher.digest()
+
+
+def compute_image_hash(image_bytes: bytes) -> str:
+    """
+    Compute the content hash of an uploaded image.
+
+    Computed once per upload (in the /jobs route) and passed along, so the
+    result cache and the preprocessing cache don't each rehash the bytes.
+
+    Args:
+        image_bytes: Raw image bytes
+
+    Returns:
+        Hex digest of image_fingerprint(image_bytes)
+    """
+    return image_fingerprint(image_bytes).hex()
@@ -1,15 +1,26 @@
 """Feature maps visualization utilities."""
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-import numpy as np
 import torch
 from PIL import Image
 
+from app.core.config import settings
+
 logger = logging.getLogger("app.inspect.feature_maps")
 
+# PNG encoding (zlib) releases the GIL, so a layer's channels are encoded and written in parallel
+_png_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="png")
+
+
+def _save_png(item: Tuple[Image.Image, Path]) -> None:
+    image, file_path = item
+    image.save(file_path, format='PNG', compress_level=settings.PNG_COMPRESS_LEVEL)
+
 
 def save_feature_maps(
     activation_tensor: torch.Tensor,
@@ -32,7 +43,8 @@ def save_feature_maps(
         List of dictionaries, each containing:
         - channel_index: int (original channel index)
         - mean: float (mean activation value)
-        - max: float (max activation value)
+        - min: float (min activation value, maps to 0 in the PNG)
+        - max: float (max activation value, maps to 255 in the PNG)
         - file_path: str (relative path from storage_dir)
     """
     # Remove batch dimension: [1, C, H, W] -> [C, H, W]
@@ -46,45 +58,48 @@ def save_feature_maps(
     channel_means = torch.mean(activations, dim=(1, 2))
 
     # Get top_k channel indices (sorted by mean activation, descending)
-    _, top_indices = torch.topk(channel_means, k=top_k, largest=True)
-    top_indices = top_indices.cpu().numpy()
+    top_means, top_indices = torch.topk(channel_means, k=top_k, largest=True)
+
+    # Gather the selected channels on device so only [top_k, H, W] is copied to the host
+    selected = activations[top_indices]  # Shape: [top_k, H, W]
+    top_mins = torch.amin(selected, dim=(1, 2), keepdim=True)
+    top_maxes = torch.amax(selected, dim=(1, 2), keepdim=True)
+
+    # Quantize to the 8-bit grayscale written to PNG, on device
+    value_range = top_maxes - top_mins
+    quantized = (selected - top_mins) / value_range.clamp(min=1e-6) * 255.0
+    # Constant channels (no range to normalize): black if ~0, white otherwise
+    constant_fill = torch.where(top_maxes < 1e-6, 0.0, 255.0)
+    quantized = torch.where(value_range > 1e-6, quantized, constant_fill)
+    quantized = quantized.clamp_(0, 255).to(torch.uint8)
+
+    # One device-to-host copy each for the stats and the uint8 channels
+    top_means, top_mins, top_maxes = torch.stack((top_means, top_mins.flatten(), top_maxes.flatten())).tolist()
+    top_indices = top_indices.tolist()
+    quantized = quantized.cpu().numpy()
 
     # Create storage directory: STORAGE_DIR/{job_id}/{layer_name}/
     layer_dir = storage_dir / job_id / layer_name
     layer_dir.mkdir(parents=True, exist_ok=True)
 
     manifest = []
+    pending_images = []
 
     # Process each selected channel
     for idx, channel_idx in enumerate(top_indices):
-        # Extract channel: [H, W]
-        channel = activations[channel_idx].cpu().numpy()
-
-        # Compute stats before normalization
-        channel_mean = float(np.mean(channel))
-        channel_max = float(np.max(channel))
-
-        # Normalize to 0-255 range
-        channel_min = np.min(channel)
-        channel_max_val = np.max(channel)
-
-        if channel_max_val - channel_min > 1e-6:  # Avoid division by zero
-            normalized = (channel - channel_min) / (channel_max_val - channel_min) * 255.0
-        else:
-            # Handle edge case: constant values
-            normalized = np.zeros_like(channel) if channel_max_val < 1e-6 else np.full_like(channel, 255.0)
-
-        # Convert to uint8
-        normalized = np.clip(normalized, 0, 255).astype(np.uint8)
+        # Stats before normalization
+        channel_mean = top_means[idx]
+        channel_min = top_mins[idx]
+        channel_max = top_maxes[idx]
 
         # Create PIL Image (mode='L' for grayscale)
-        image = Image.fromarray(normalized, mode='L')
+        image = Image.fromarray(quantized[idx], mode='L')
 
         # Save to file: ch_{channel_idx}.png
         filename = f"ch_{channel_idx}.png"
         file_path = layer_dir / filename
 
-        image.save(file_path, format='PNG')
+        pending_images.append((image, file_path))
 
         # Compute relative path from storage_dir
         relative_path = file_path.relative_to(storage_dir)
@@ -94,12 +109,16 @@ def save_feature_maps(
         manifest.append({
             "channel_index": int(channel_idx),
             "mean": channel_mean,
+            "min": channel_min,
             "max": channel_max,
             "file_path": relative_path_str,
         })
 
         logger.debug(f"Saved feature map: {relative_path_str} (channel {channel_idx}, mean={channel_mean:.4f})")
 
+    # Wait for all writes so the files exist once the manifest is returned
+    list(_png_pool.map(_save_png, pending_images))
+
     logger.info(f"Saved {len(manifest)} feature maps for layer '{layer_name}' to {layer_dir}")
 
     return manifest
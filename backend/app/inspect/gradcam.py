@@ -4,7 +4,7 @@ import json
 import logging
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -12,6 +12,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 from PIL import Image
 
+from app.core.config import settings
 from app.inspect.hooks import get_layer_by_path
 
 logger = logging.getLogger("app.inspect.gradcam")
@@ -116,24 +117,16 @@ def generate_gradcam(
     # Get target layer
     target_module = get_layer_by_path(model, target_layer)
 
-    # Storage for activations and gradients
+    # Storage for activations (kept attached to the graph so gradients can be taken w.r.t. them)
     activations = None
-    gradients = None
 
     def forward_hook(module, input, output):
         """Hook to store activations."""
         nonlocal activations
-        activations = output.detach()
+        activations = output
 
-    def backward_hook(module, grad_input, grad_output):
-        """Hook to store gradients."""
-        nonlocal gradients
-        if grad_output is not None and len(grad_output) > 0:
-            gradients = grad_output[0].detach()
-
-    # Register hooks
+    # Register hook
     forward_handle = target_module.register_forward_hook(forward_hook)
-    backward_handle = target_module.register_full_backward_hook(backward_hook)
 
     try:
         # Forward pass
@@ -144,13 +137,15 @@ def generate_gradcam(
         probs = F.softmax(output, dim=1)
         top_class = torch.argmax(probs, dim=1).item()
 
-        # Backward pass for top-1 class
-        model.zero_grad()
-        output[0, top_class].backward()
-
         # Compute Grad-CAM
-        if gradients is None or activations is None:
+        if activations is None:
+            raise ValueError(f"Failed to capture gradients or activations from layer '{target_layer}'")
+
+        # Gradient of the top-1 score w.r.t. the layer output only (no parameter .grad buffers)
+        gradients = _grad_wrt(output[0, top_class], [activations])[0]
+        if gradients is None:
             raise ValueError(f"Failed to capture gradients or activations from layer '{target_layer}'")
+        activations = activations.detach()
 
         # Grad-CAM computation
         # gradients shape: [1, C, H, W]
@@ -185,29 +180,14 @@ def generate_gradcam(
         else:
             cam_normalized = torch.zeros_like(cam)
 
-        # Convert to numpy
-        cam_np = cam_normalized.detach().cpu().numpy()
-
-        # Resize to match original image size
+        # Resize to match original image size (grayscale heatmap)
         original_size = original_image.size  # (width, height)
-        cam_resized = np.array(Image.fromarray(cam_np).resize(original_size, Image.BILINEAR))
-
-        # Generate heatmap (grayscale)
-        heatmap_gray = (cam_resized * 255).astype(np.uint8)
+        heatmap_gray = _upsample_cam(cam_normalized, original_size)
         heatmap_image = Image.fromarray(heatmap_gray, mode='L')
 
-        # Generate colored heatmap for overlay (using simple colormap)
-        # Convert grayscale to RGB using a simple colormap (red for high, blue for low)
-        heatmap_rgb = apply_colormap(cam_resized)
-
-        # Overlay on original image
-        original_array = np.array(original_image).astype(np.float32) / 255.0
-        heatmap_array = heatmap_rgb.astype(np.float32) / 255.0
-
-        # Alpha blending
-        overlay_array = (1 - alpha) * original_array + alpha * heatmap_array
-        overlay_array = np.clip(overlay_array * 255, 0, 255).astype(np.uint8)
-        overlay_image = Image.fromarray(overlay_array, mode='RGB')
+        # Colormap (red for high, blue for low) and alpha-blend onto the original image
+        overlay_base, heatmap_lut = _prepare_overlay(original_image, alpha)
+        overlay_image = _blend_overlay(heatmap_gray, overlay_base, heatmap_lut)
 
         # Create storage directory
         layer_dir = storage_dir / job_id / layer_name
@@ -217,8 +197,8 @@ def generate_gradcam(
         heatmap_path = layer_dir / "heatmap.png"
         overlay_path = layer_dir / "overlay.png"
 
-        heatmap_image.save(heatmap_path, format='PNG')
-        overlay_image.save(overlay_path, format='PNG')
+        heatmap_image.save(heatmap_path, format='PNG', compress_level=settings.PNG_COMPRESS_LEVEL)
+        overlay_image.save(overlay_path, format='PNG', compress_level=settings.PNG_COMPRESS_LEVEL)
 
         # Compute relative paths
         heatmap_relative = heatmap_path.relative_to(storage_dir)
@@ -235,14 +215,34 @@ def generate_gradcam(
         }
 
     finally:
-        # Clean up hooks and gradients
+        # Clean up hook
         forward_handle.remove()
-        backward_handle.remove()
-        model.zero_grad()
 
-        # Detach and clear computation graph
-        if input_tensor.grad is not None:
-            input_tensor.grad = None
+
+def _grad_wrt(
+    score: torch.Tensor,
+    activations: List[torch.Tensor],
+    retain_graph: bool = False,
+) -> Tuple[Optional[torch.Tensor], ...]:
+    """
+    Compute gradients of a class score w.r.t. captured layer outputs.
+
+    Uses torch.autograd.grad instead of score.backward(): autograd only walks the
+    part of the graph between the score and the given activations, and no .grad
+    buffers are allocated or accumulated on the model parameters (so there is
+    nothing to zero afterwards).
+
+    Args:
+        score: Scalar class score (e.g., output[0, class_id])
+        activations: Layer outputs captured during the forward pass (not detached)
+        retain_graph: Keep the graph for further gradient computations
+
+    Returns:
+        Tuple of detached gradients, one per activation (None if the score doesn't
+        depend on that activation)
+    """
+    gradients = torch.autograd.grad(score, activations, retain_graph=retain_graph, allow_unused=True)
+    return tuple(g.detach() if g is not None else None for g in gradients)
 
 
 def _compute_cam_for_class(
@@ -266,39 +266,31 @@ def _compute_cam_for_class(
     # Get target layer
     target_module = get_layer_by_path(model, target_layer)
 
-    # Storage for activations and gradients
+    # Storage for activations (kept attached to the graph so gradients can be taken w.r.t. them)
     activations = None
-    gradients = None
 
     def forward_hook(module, input, output):
         nonlocal activations
-        activations = output.detach()
+        activations = output
 
-    def backward_hook(module, grad_input, grad_output):
-        nonlocal gradients
-        if grad_output is not None and len(grad_output) > 0:
-            gradients = grad_output[0].detach()
-
-    # Register hooks
+    # Register hook
     forward_handle = target_module.register_forward_hook(forward_hook)
-    backward_handle = target_module.register_full_backward_hook(backward_hook)
 
     try:
         # Forward pass
         output = model(input_tensor)
 
-        # Backward pass for specific class
-        model.zero_grad()
-        output[0, class_id].backward()
+        if activations is None:
+            raise ValueError(f"Failed to capture gradients or activations from layer '{target_layer}'")
 
-        if gradients is None or activations is None:
+        # Gradient of the class score w.r.t. the layer output only
+        gradients = _grad_wrt(output[0, class_id], [activations])[0]
+        if gradients is None:
             raise ValueError(f"Failed to capture gradients or activations from layer '{target_layer}'")
 
-        return activations, gradients
+        return activations.detach(), gradients
     finally:
         forward_handle.remove()
-        backward_handle.remove()
-        model.zero_grad()
 
 
 def _compute_cam_from_activations_gradients(
@@ -391,6 +383,68 @@ def apply_colormap(heatmap: np.ndarray) -> np.ndarray:
     return rgb
 
 
+# apply_colormap() sampled at the 256 quantized CAM levels, built once at import
+_COLORMAP_LUT = apply_colormap(np.linspace(0.0, 1.0, 256, dtype=np.float32)[np.newaxis, :])[0]
+
+
+def _prepare_overlay(original_image: Image.Image, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precompute the alpha-scaled blend inputs shared by every overlay of one image.
+
+    Args:
+        original_image: Original RGB image
+        alpha: Overlay transparency (0.0 to 1.0)
+
+    Returns:
+        Tuple of (original image scaled by 1 - alpha as float32 [H, W, 3],
+        colormap LUT scaled by alpha as float32 [256, 3])
+    """
+    overlay_base = np.asarray(original_image, dtype=np.float32) * (1 - alpha)
+    heatmap_lut = _COLORMAP_LUT.astype(np.float32) * alpha
+    return overlay_base, heatmap_lut
+
+
+def _upsample_cam(cam_normalized: torch.Tensor, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Upsample a normalized CAM to image size and quantize it to 8 bits.
+
+    The resize runs on the CAM's device; only the final uint8 map is copied to CPU.
+
+    Args:
+        cam_normalized: CAM tensor [H, W] with values in [0, 1]
+        size: Target size as (width, height), like PIL's Image.size
+
+    Returns:
+        uint8 array [height, width]
+    """
+    width, height = size
+    cam = F.interpolate(
+        cam_normalized.detach().float()[None, None],
+        size=(height, width),
+        mode="bilinear",
+        align_corners=False,
+    )
+    return (cam[0, 0].clamp_(0, 1) * 255).to(torch.uint8).cpu().numpy()
+
+
+def _blend_overlay(cam_u8: np.ndarray, overlay_base: np.ndarray, heatmap_lut: np.ndarray) -> Image.Image:
+    """
+    Colormap a quantized CAM and alpha-blend it onto the original image.
+
+    Args:
+        cam_u8: Quantized CAM [H, W] from _upsample_cam()
+        overlay_base: Scaled original image from _prepare_overlay()
+        heatmap_lut: Scaled colormap LUT from _prepare_overlay()
+
+    Returns:
+        RGB overlay image
+    """
+    overlay_array = heatmap_lut[cam_u8]
+    np.add(overlay_array, overlay_base, out=overlay_array)
+    np.clip(overlay_array, 0, 255, out=overlay_array)
+    return Image.fromarray(overlay_array.astype(np.uint8), mode='RGB')
+
+
 def generate_gradcam_topk(
     model: nn.Module,
     input_tensor: torch.Tensor,
@@ -442,6 +496,7 @@ def generate_gradcam_topk(
     cams_dir.mkdir(parents=True, exist_ok=True)
 
     original_size = original_image.size  # (width, height)
+    overlay_base, heatmap_lut = _prepare_overlay(original_image, alpha)
     results = []
 
     # Process each top class
@@ -460,28 +515,14 @@ def generate_gradcam_topk(
             # Compute CAM from activations and gradients
             cam_normalized = _compute_cam_from_activations_gradients(activations, gradients)
 
-            # Convert to numpy
-            cam_np = cam_normalized.detach().cpu().numpy()
-
-            # Resize to match original image size
-            cam_resized = np.array(Image.fromarray(cam_np).resize(original_size, Image.BILINEAR))
-
-            # Generate colored heatmap for overlay
-            heatmap_rgb = apply_colormap(cam_resized)
-
-            # Overlay on original image
-            original_array = np.array(original_image).astype(np.float32) / 255.0
-            heatmap_array = heatmap_rgb.astype(np.float32) / 255.0
-
-            # Alpha blending
-            overlay_array = (1 - alpha) * original_array + alpha * heatmap_array
-            overlay_array = np.clip(overlay_array * 255, 0, 255).astype(np.uint8)
-            overlay_image = Image.fromarray(overlay_array, mode='RGB')
+            # Resize to match original image size, colormap and alpha-blend
+            cam_resized = _upsample_cam(cam_normalized, original_size)
+            overlay_image = _blend_overlay(cam_resized, overlay_base, heatmap_lut)
 
             # Save overlay
             filename = f"class_{class_id_int}.png"
             overlay_path = cams_dir / filename
-            overlay_image.save(overlay_path, format='PNG')
+            overlay_image.save(overlay_path, format='PNG', compress_level=settings.PNG_COMPRESS_LEVEL)
 
             # Compute relative path
             overlay_relative = overlay_path.relative_to(storage_dir)
@@ -562,27 +603,19 @@ def generate_gradcam_multilayer(
     if not layer_modules:
         raise ValueError(f"No valid layers found in cam_layers: {cam_layers}")
 
-    # Storage for activations and gradients (one dict per layer)
+    # Storage for activations, kept attached to the graph so gradients can be taken w.r.t. them
     activations_dict = {}
-    gradients_dict = {}
 
     # Create hook functions that capture data for specific layers
     def make_forward_hook(layer_name):
         def hook(module, input, output):
-            activations_dict[layer_name] = output.detach()
+            activations_dict[layer_name] = output
         return hook
 
-    def make_backward_hook(layer_name):
-        def hook(module, grad_input, grad_output):
-            if grad_output is not None and len(grad_output) > 0:
-                gradients_dict[layer_name] = grad_output[0].detach()
-        return hook
-
-    # Register hooks for all layers
+    # Register forward hooks for all layers (gradients come from autograd.grad, no backward hooks)
     handles = []
     for layer_name, module in layer_modules.items():
         handles.append(module.register_forward_hook(make_forward_hook(layer_name)))
-        handles.append(module.register_full_backward_hook(make_backward_hook(layer_name)))
 
     try:
         # ONE forward pass to get predictions and capture activations for all layers
@@ -599,21 +632,31 @@ def generate_gradcam_multilayer(
         top_probs = top_probs.detach().cpu().numpy()
 
         original_size = original_image.size  # (width, height)
+        overlay_base, heatmap_lut = _prepare_overlay(original_image, alpha)
         classes_data = []
         warnings = []
 
+        # Layers whose outputs were captured; gradients are taken w.r.t. all of them at once
+        captured_layers = list(activations_dict)
+        captured_activations = [activations_dict[name] for name in captured_layers]
+        activations_dict = {name: activations.detach() for name, activations in activations_dict.items()}
+
         # Process each top class (default is top_k=1, so usually just one iteration)
         for class_idx, (class_id, prob) in enumerate(zip(top_indices, top_probs)):
             class_id_int = int(class_id)
             class_name = _get_imagenet_class_name(class_id_int)
             overlays = []
 
-            # ONE backward pass for this class (captures gradients for all layers)
+            # ONE backward pass for this class (gradients for all layers)
             backward_start = time.time()
-            model.zero_grad()
             # Use retain_graph=True if we have more classes to process (allows multiple backward passes)
             retain_graph = (class_idx < len(top_indices) - 1)
-            output[0, class_id_int].backward(retain_graph=retain_graph)
+            layer_gradients = _grad_wrt(output[0, class_id_int], captured_activations, retain_graph=retain_graph)
+            gradients_dict = {
+                name: gradients
+                for name, gradients in zip(captured_layers, layer_gradients)
+                if gradients is not None
+            }
             backward_time = (time.time() - backward_start) * 1000
 
             # Post-processing start time
@@ -634,23 +677,9 @@ def generate_gradcam_multilayer(
                     # Compute CAM from activations and gradients
                     cam_normalized = _compute_cam_from_activations_gradients(activations, gradients)
 
-                    # Convert to numpy
-                    cam_np = cam_normalized.detach().cpu().numpy()
-
-                    # Resize to match original image size
-                    cam_resized = np.array(Image.fromarray(cam_np).resize(original_size, Image.BILINEAR))
-
-                    # Generate colored heatmap for overlay
-                    heatmap_rgb = apply_colormap(cam_resized)
-
-                    # Overlay on original image
-                    original_array = np.array(original_image).astype(np.float32) / 255.0
-                    heatmap_array = heatmap_rgb.astype(np.float32) / 255.0
-
-                    # Alpha blending
-                    overlay_array = (1 - alpha) * original_array + alpha * heatmap_array
-                    overlay_array = np.clip(overlay_array * 255, 0, 255).astype(np.uint8)
-                    overlay_image = Image.fromarray(overlay_array, mode='RGB')
+                    # Resize to match original image size, colormap and alpha-blend
+                    cam_resized = _upsample_cam(cam_normalized, original_size)
+                    overlay_image = _blend_overlay(cam_resized, overlay_base, heatmap_lut)
 
                     # Create storage directory: STORAGE_DIR/{job_id}/gradcam/{class_id}/{layer_name}.png
                     gradcam_dir = storage_dir / job_id / "gradcam" / str(class_id_int)
@@ -658,7 +687,7 @@ def generate_gradcam_multilayer(
 
                     # Save overlay
                     overlay_path = gradcam_dir / f"{layer_name}.png"
-                    overlay_image.save(overlay_path, format='PNG')
+                    overlay_image.save(overlay_path, format='PNG', compress_level=settings.PNG_COMPRESS_LEVEL)
 
                     # Compute relative path and URL
                     overlay_relative = overlay_path.relative_to(storage_dir)
@@ -710,4 +739,3 @@ def generate_gradcam_multilayer(
         # Clean up hooks
         for handle in handles:
             handle.remove()
-        model.zero_grad()
@@ -53,7 +53,8 @@ class ChannelInfo(BaseModel):
     """Channel information."""
     channel: int
     mean: float
-    max: float
+    min: Optional[float] = None  # Activation value mapped to 0 in the PNG (None for results stored before it was added)
+    max: float  # Activation value mapped to 255 in the PNG
     image_url: str
 
 
@@ -1,82 +1,104 @@
 """Job service for managing inference jobs."""
 
 import asyncio
-import io
 import logging
+import operator
 import time
 import uuid
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set
 
 import torch
-import torch.nn.functional as F
 from PIL import Image
 
 from app.core.config import settings
+from app.core.hashing import compute_image_hash
 from app.inspect.feature_maps import save_feature_maps
 from app.inspect.gradcam import generate_gradcam_multilayer, generate_gradcam_topk
 from app.inspect.hooks import capture_activations
 from app.jobs.models import JobRecord, JobResult, JobStatus
+from app.jobs.store import JobStore, create_job_store
 from app.models.layer_mapping import get_cam_target_path, get_default_cam_layers
-from app.models.loaders import load_model, preprocess_image
+from app.models.loaders import decode_image, get_cached_input, load_model, preprocess_image
 from app.models.registry import get_model_config
 from app.services.cache import cache_service
+from app.services.inference import inference_service
 
 logger = logging.getLogger("app.jobs.service")
 
+# Pulls the response fields out of a feature map manifest entry in one C-level call
+_fm_get = operator.itemgetter("channel_index", "mean", "min", "max", "file_path")
+
 
 class JobService:
     """Service for managing inference jobs."""
 
+    WATCH_POLL_SECONDS = 1.0  # watch_job() re-read interval for updates made by other processes
+
     def __init__(self):
         """Initialize job service."""
-        self._jobs: Dict[str, JobRecord] = {}
-        self._job_data: Dict[str, bytes] = {}  # Store image_bytes for each job
-        self._job_params: Dict[str, Tuple[int, List[str]]] = {}  # Store (top_k, cam_layers) for each job
-        self._job_queue: asyncio.Queue[str] = asyncio.Queue()
-        self._lock: asyncio.Lock = asyncio.Lock()
-        self._worker_task: Optional[asyncio.Task] = None
+        self._store: JobStore = create_job_store()
+        self._worker_tasks: List[asyncio.Task] = []
         self._worker_running: bool = False
+        # Wake-up events of /jobs/{id}/events streams watching each job (this process only)
+        self._job_watchers: Dict[str, Set[asyncio.Event]] = {}
+
+    async def reset_state(self) -> None:
+        """Delete all jobs and queued work from the job store (used by tests)."""
+        await self._store.clear()
 
-    async def create_job(self, model_id: str, image_bytes: bytes, top_k: int = 3, cam_layers: Optional[List[str]] = None) -> str:
+    async def create_job(
+        self,
+        model_id: str,
+        image_bytes: bytes,
+        top_k: int = 3,
+        cam_layers: Optional[List[str]] = None,
+        image_hash: Optional[str] = None,
+    ) -> str:
         """
         Create a new inference job.
 
         Checks cache first - if cached result exists, returns immediate SUCCEEDED job.
-        Otherwise, creates new job and queues for processing.
+        Otherwise, writes the image to the job's storage directory and queues the
+        job for processing, so queued jobs only hold a path in memory.
 
         Args:
             model_id: Model identifier from registry
             image_bytes: Image file bytes
             top_k: Number of top classes for Grad-CAM (default: 3)
             cam_layers: List of layer names for Grad-CAM (default: None, uses default layers)
+            image_hash: Precomputed compute_image_hash(image_bytes) (computed here if None)
 
         Returns:
             Job ID (UUID string)
         """
+        if image_hash is None:
+            image_hash = compute_image_hash(image_bytes)
+
         # Default cam_layers if None - use model-specific defaults from registry
         if cam_layers is None:
-            cam_layers = get_default_cam_layers(model_id)
+            cam_layers = list(get_default_cam_layers(model_id))
             if not cam_layers:
                 raise ValueError(f"No default CAM layers found for model '{model_id}'")
 
         # Check cache first (if enabled)
+        cache_key = None
         if settings.CACHE_ENABLED:
-            cache_key = cache_service.compute_cache_key(image_bytes, model_id, top_k=top_k, cam_layers=cam_layers)
+            cache_key = cache_service.compute_cache_key(image_hash, model_id, top_k=top_k, cam_layers=cam_layers)
             cached_result = cache_service.get(cache_key)
 
             if cached_result is not None:
                 # Cache hit: create job with SUCCEEDED status immediately
                 job_id = str(uuid.uuid4())
-                async with self._lock:
-                    job_record = JobRecord(
-                        job_id=job_id,
-                        model_id=model_id,
-                        status=JobStatus.SUCCEEDED,
-                        progress=100,
-                        message="Job completed (cached)",
-                        result=cached_result,
-                    )
-                    self._jobs[job_id] = job_record
+                job_record = JobRecord(
+                    job_id=job_id,
+                    model_id=model_id,
+                    status=JobStatus.SUCCEEDED,
+                    progress=100,
+                    message="Job completed (cached)",
+                    result=cached_result,
+                )
+                await self._store.add_job(job_record)
 
                 logger.info(f"Created job {job_id} for model {model_id} (cache hit)")
                 return job_id
@@ -84,20 +106,20 @@ class JobService:
         # Cache miss: create new job and queue for processing
         job_id = str(uuid.uuid4())
 
-        async with self._lock:
-            job_record = JobRecord(
-                job_id=job_id,
-                model_id=model_id,
-                status=JobStatus.QUEUED,
-                progress=0,
-                message="Job queued",
-            )
-
-            self._jobs[job_id] = job_record
-            self._job_data[job_id] = image_bytes
-            self._job_params[job_id] = (top_k, cam_layers)
-
-        await self._job_queue.put(job_id)
+        # Spill the upload to disk now; process_job reads it back just-in-time
+        image_path = settings.STORAGE_DIR / job_id / "input.png"
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        image_path.write_bytes(image_bytes)
+
+        job_record = JobRecord(
+            job_id=job_id,
+            model_id=model_id,
+            status=JobStatus.QUEUED,
+            progress=0,
+            message="Job queued",
+        )
+        await self._store.add_job(job_record, image_path=str(image_path), params=(top_k, cam_layers, cache_key, image_hash))
+        await self._store.enqueue(job_id)
 
         logger.info(f"Created job {job_id} for model {model_id} (cache miss)")
         return job_id
@@ -112,8 +134,56 @@ class JobService:
         Returns:
             JobRecord if found, None otherwise
         """
-        async with self._lock:
-            return self._jobs.get(job_id)
+        return await self._store.get_job(job_id)
+
+    async def watch_job(self, job_id: str) -> AsyncIterator[JobRecord]:
+        """
+        Yield the job record each time its status, progress or message changes.
+
+        Updates made by this process wake the watcher immediately; the record is
+        also re-read every WATCH_POLL_SECONDS so updates from worker processes on
+        other replicas (Redis job store) are picked up too.
+
+        Args:
+            job_id: Unique job identifier
+
+        Yields:
+            JobRecord, starting with the current one; stops after SUCCEEDED or FAILED
+            (or if the job doesn't exist)
+        """
+        event = asyncio.Event()
+        self._job_watchers.setdefault(job_id, set()).add(event)
+        last_state = None
+        try:
+            while True:
+                event.clear()
+                job = await self._store.get_job(job_id)
+                if job is None:
+                    return
+
+                state = (job.status, job.progress, job.message)
+                if state != last_state:
+                    last_state = state
+                    yield job
+                if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                    return
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=self.WATCH_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            watchers = self._job_watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(event)
+                if not watchers:
+                    del self._job_watchers[job_id]
+
+    async def _update_job(self, job_id: str, **fields) -> None:
+        """Update job fields in the store and wake up watch_job() streams."""
+        await self._store.update_job(job_id, **fields)
+        for event in self._job_watchers.get(job_id, ()):
+            event.set()
 
     async def _update_job_progress(
         self,
@@ -123,14 +193,12 @@ class JobService:
         status: Optional[JobStatus] = None,
     ) -> None:
         """Update job progress and status."""
-        async with self._lock:
-            job = self._jobs.get(job_id)
-            if job:
-                job.progress = progress
-                if message:
-                    job.message = message
-                if status:
-                    job.status = status
+        fields = {"progress": progress}
+        if message:
+            fields["message"] = message
+        if status:
+            fields["status"] = status
+        await self._update_job(job_id, **fields)
 
     async def process_job(self, job_id: str) -> None:
         """
@@ -142,17 +210,15 @@ class JobService:
         start_time = time.time()
 
         try:
-            # Get job, image data, and params
-            async with self._lock:
-                job = self._jobs.get(job_id)
-                image_bytes = self._job_data.get(job_id)
-                job_params = self._job_params.get(job_id)
+            # Get job, image path, and params
+            job = await self._store.get_job(job_id)
+            image_path, job_params = await self._store.get_job_input(job_id)
 
             if not job:
                 logger.error(f"Job {job_id} not found in storage")
                 return
 
-            if not image_bytes:
+            if not image_path:
                 logger.error(f"Image data not found for job {job_id}")
                 await self._update_job_progress(
                     job_id,
@@ -167,11 +233,13 @@ class JobService:
 
             # Get params (defaults if not found)
             if job_params:
-                top_k, cam_layers = job_params
+                top_k, cam_layers, cache_key, image_hash = job_params
             else:
                 top_k = 3
+                cache_key = None
+                image_hash = None
                 # Use model-specific defaults from registry
-                cam_layers = get_default_cam_layers(model_id)
+                cam_layers = list(get_default_cam_layers(model_id))
                 if not cam_layers:
                     logger.warning(f"No default CAM layers found for model '{model_id}', using empty list")
                     cam_layers = []
@@ -187,19 +255,10 @@ class JobService:
 
             storage_dir = settings.STORAGE_DIR
 
-            # Store image_bytes for cache key generation later
-            # (needed before it's popped in finally block)
-
-            # Save original image
-            image_path = storage_dir / job_id / "input.png"
-            image_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(image_path, "wb") as f:
-                f.write(image_bytes)
-
-            # Load original image for visualization
-            original_image = Image.open(io.BytesIO(image_bytes))
-            if original_image.mode != "RGB":
-                original_image = original_image.convert("RGB")
+            # Read the original image spilled to disk by create_job
+            image_bytes = Path(image_path).read_bytes()
+            if image_hash is None:
+                image_hash = compute_image_hash(image_bytes)
 
             # Step 1: Load model (progress: 10%)
             model_load_start = time.time()
@@ -211,7 +270,18 @@ class JobService:
             # Step 2: Preprocess (progress: 20%)
             preprocess_start = time.time()
             await self._update_job_progress(job_id, progress=20, message="Preprocessing image")
-            input_tensor = preprocess_image(image_bytes, model_id)
+            # Check the preprocessing cache before decoding: a resubmitted image skips the decode
+            # here and is only decoded for the Grad-CAM overlays
+            image_tensor = None
+            input_tensor = get_cached_input(image_hash, model_id)
+            if input_tensor is None:
+                # Full resolution: the same tensor is reused for the overlays below
+                image_tensor = decode_image(image_bytes)
+                input_tensor = preprocess_image(image_tensor, model_id, image_key=image_hash)
+            # Match the model's channels_last layout so conv2d doesn't reorder on every call
+            input_tensor = input_tensor.contiguous(memory_format=torch.channels_last)
+            # On CUDA this copies from pinned memory on a side stream, overlapping other jobs' forwards
+            input_tensor = inference_service.to_device(input_tensor)
             preprocess_time = (time.time() - preprocess_start) * 1000  # Convert to ms
             logger.info(f"Job {job_id}: Image preprocessed ({preprocess_time:.1f}ms)")
 
@@ -219,16 +289,12 @@ class JobService:
             forward_start = time.time()
             await self._update_job_progress(job_id, progress=40, message="Running forward pass")
 
-            model.eval()
-            with torch.no_grad():
-                output = model(input_tensor)
-
             # Get top-K predictions (use top_k from job_params, but get at least top-5 for prediction display)
-            probs = F.softmax(output, dim=1)
             prediction_top_k = max(top_k, 5)  # Get at least top-5 predictions for display
-            top_probs, top_indices = torch.topk(probs[0], k=min(prediction_top_k, probs.shape[1]))
-            top_indices = top_indices.cpu().numpy()
-            top_probs = top_probs.cpu().numpy()
+            # Batched with concurrent jobs on the same model by the inference service. Results
+            # are kept on device; copied to host only when the response is built so the
+            # device sync doesn't stall the Grad-CAM passes queued behind it
+            top_probs, top_indices = await inference_service.run_inference(model_id, input_tensor, prediction_top_k)
 
             forward_time = (time.time() - forward_start) * 1000  # Convert to ms
             logger.info(f"Job {job_id}: Forward pass completed ({forward_time:.1f}ms)")
@@ -283,13 +349,8 @@ class JobService:
 
                 # Convert to response format
                 top_channels = [
-                    {
-                        "channel": item["channel_index"],
-                        "mean": item["mean"],
-                        "max": item["max"],
-                        "image_url": f"/static/{item['file_path']}",
-                    }
-                    for item in feature_maps_manifest
+                    {"channel": c, "mean": m, "min": mn, "max": mx, "image_url": f"/static/{p}"}
+                    for c, m, mn, mx, p in map(_fm_get, feature_maps_manifest)
                 ]
 
                 # Get stage for this layer
@@ -313,6 +374,11 @@ class JobService:
             serialize_start = time.time()
             await self._update_job_progress(job_id, progress=80, message="Generating GradCAM visualizations")
 
+            # Overlays are drawn on the full-resolution original image
+            if image_tensor is None:
+                image_tensor = decode_image(image_bytes)
+            original_image = Image.fromarray(image_tensor.permute(1, 2, 0).numpy())
+
             # Generate multi-layer Grad-CAM
             gradcam_data = generate_gradcam_multilayer(
                 model=model,
@@ -360,7 +426,7 @@ class JobService:
                     "class_name": _get_imagenet_class_name(int(class_id)),
                     "prob": float(prob),
                 }
-                for class_id, prob in zip(top_indices, top_probs)
+                for class_id, prob in zip(top_indices.cpu().tolist(), top_probs.cpu().tolist())
             ]
 
             # Get model display name
@@ -386,17 +452,18 @@ class JobService:
             )
 
             # Update job with result and mark as SUCCEEDED
-            async with self._lock:
-                job = self._jobs.get(job_id)
-                if job:
-                    job.status = JobStatus.SUCCEEDED
-                    job.progress = 100
-                    job.message = "Job completed successfully"
-                    job.result = result
+            await self._update_job(
+                job_id,
+                status=JobStatus.SUCCEEDED,
+                progress=100,
+                message="Job completed successfully",
+                result=result,
+            )
 
             # Store result in cache (if enabled)
             if settings.CACHE_ENABLED:
-                cache_key = cache_service.compute_cache_key(image_bytes, model_id)
+                if cache_key is None:
+                    cache_key = cache_service.compute_cache_key(image_hash, model_id, top_k=top_k, cam_layers=cam_layers)
                 cache_service.set(cache_key, result)
                 logger.debug(f"Cached result for job {job_id}")
 
@@ -404,66 +471,79 @@ class JobService:
 
         except Exception as e:
             # Handle errors and mark job as FAILED
-            async with self._lock:
-                job = self._jobs.get(job_id)
-                if job:
-                    job.status = JobStatus.FAILED
-                    job.message = f"Job failed: {str(e)}"
-                    job.progress = 0
+            await self._update_job(
+                job_id,
+                status=JobStatus.FAILED,
+                message=f"Job failed: {str(e)}",
+                progress=0,
+            )
             logger.error(f"Job {job_id} failed: {e}", exc_info=True)
         finally:
-            # Clean up image data and params (always runs, success or failure)
-            async with self._lock:
-                self._job_data.pop(job_id, None)
-                self._job_params.pop(job_id, None)
+            # Clean up image path and params (always runs, success or failure)
+            await self._store.discard_job_input(job_id)
 
-    async def _worker_loop(self) -> None:
+    async def _worker_loop(self, worker_index: int) -> None:
         """Background worker loop that processes jobs from queue."""
-        logger.info("Job worker loop started")
-        self._worker_running = True
+        logger.info("Job worker loop %d started", worker_index)
 
         while self._worker_running:
             try:
-                job_id = await self._job_queue.get()
-
-                # Check for shutdown signal
-                if job_id == "shutdown_signal":
-                    break
+                # None means timeout or shutdown signal; re-check the running flag
+                job_id = await self._store.dequeue()
+                if job_id is None:
+                    continue
 
                 await self.process_job(job_id)
-                self._job_queue.task_done()
+                await self._store.task_done(job_id)
 
             except asyncio.CancelledError:
-                logger.info("Job worker loop cancelled")
+                logger.info("Job worker loop %d cancelled", worker_index)
                 break
             except Exception as e:
                 logger.error(f"Error in worker loop: {e}", exc_info=True)
 
-        logger.info("Job worker loop stopped")
+        logger.info("Job worker loop %d stopped", worker_index)
 
     async def start_worker(self) -> None:
-        """Start the background worker."""
-        if self._worker_task is None or self._worker_task.done():
-            self._worker_task = asyncio.create_task(self._worker_loop())
-            logger.info("Job worker started")
+        """
+        Start settings.WORKER_CONCURRENCY background workers sharing the job queue.
 
-    async def stop_worker(self) -> None:
-        """Stop the background worker."""
-        self._worker_running = False
+        Workers run on the event loop and interleave at await points (store
+        updates, the batched forward pass), so one job's I/O overlaps another's
+        compute and concurrent forwards can be batched. The hook-based feature map
+        and Grad-CAM steps never await, so jobs sharing a model don't see each
+        other's hooks.
+        """
+        if any(not task.done() for task in self._worker_tasks):
+            return
 
-        # Put shutdown signal to unblock queue
-        await self._job_queue.put("shutdown_signal")
+        await inference_service.start()
+        self._worker_running = True
+        self._worker_tasks = [
+            asyncio.create_task(self._worker_loop(i)) for i in range(settings.WORKER_CONCURRENCY)
+        ]
+        logger.info("Job workers started (%d)", len(self._worker_tasks))
 
-        if self._worker_task and not self._worker_task.done():
-            try:
-                await asyncio.wait_for(self._worker_task, timeout=5.0)
-            except asyncio.TimeoutError:
-                logger.warning("Worker did not stop gracefully, cancelling")
-                self._worker_task.cancel()
-            except asyncio.CancelledError:
-                pass
+    async def stop_worker(self) -> None:
+        """Stop the background workers."""
+        self._worker_running = False
 
-        logger.info("Job worker stopped")
+        # Unblock every worker waiting on the queue
+        for _ in self._worker_tasks:
+            await self._store.interrupt()
+
+        pending = [task for task in self._worker_tasks if not task.done()]
+        if pending:
+            _, still_running = await asyncio.wait(pending, timeout=5.0)
+            if still_running:
+                logger.warning("%d workers did not stop gracefully, cancelling", len(still_running))
+                for task in still_running:
+                    task.cancel()
+                await asyncio.gather(*still_running, return_exceptions=True)
+        self._worker_tasks = []
+
+        await inference_service.stop()
+        logger.info("Job workers stopped")
 
 
 # Global job service instance
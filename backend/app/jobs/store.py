@@ -0,0 +1,413 @@
+"""Job state storage backends (in-process or Redis)."""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.jobs.models import JobRecord, JobStatus
+
+logger = logging.getLogger("app.jobs.store")
+
+# (top_k, cam_layers, cache_key, image_hash) stored alongside each queued job
+JobParams = Tuple[int, List[str], Optional[str], str]
+
+
+class JobStore(ABC):
+    """
+    Interface for job records, per-job inputs and the job queue.
+
+    JobService only talks to this interface, so job state can live in process
+    memory (single replica) or in Redis (shared by several API/worker replicas).
+    Backends must implement every method; a missing one fails at construction.
+    """
+
+    @abstractmethod
+    async def add_job(
+        self,
+        job: JobRecord,
+        image_path: Optional[str] = None,
+        params: Optional[JobParams] = None,
+    ) -> None:
+        """Store a new job record and (for queued jobs) its input path and params."""
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[JobRecord]:
+        """Get job record by ID, or None if not found."""
+
+    @abstractmethod
+    async def update_job(self, job_id: str, **fields: Any) -> None:
+        """Update fields (status, progress, message, result) of an existing job."""
+
+    @abstractmethod
+    async def get_job_input(self, job_id: str) -> Tuple[Optional[str], Optional[JobParams]]:
+        """Get (image_path, params) for a queued job."""
+
+    @abstractmethod
+    async def discard_job_input(self, job_id: str) -> None:
+        """Drop the input path and params once a job has been processed."""
+
+    @abstractmethod
+    async def enqueue(self, job_id: str) -> None:
+        """Add a job to the processing queue."""
+
+    @abstractmethod
+    async def dequeue(self) -> Optional[str]:
+        """
+        Wait for the next job ID.
+
+        Returns None on timeout or when interrupted, so worker loops can re-check
+        their shutdown flag.
+        """
+
+    @abstractmethod
+    async def task_done(self, job_id: str) -> None:
+        """Mark a dequeued job as processed."""
+
+    @abstractmethod
+    async def interrupt(self) -> None:
+        """Wake up a worker blocked in dequeue() (used on shutdown)."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Delete all job records, queued inputs and queued job IDs (used by tests)."""
+
+
+class MemoryJobStore(JobStore):
+    """In-process job store backed by dicts and an asyncio.Queue."""
+
+    def __init__(self):
+        """Initialize empty in-memory store."""
+        self._jobs: Dict[str, JobRecord] = {}
+        # Path of the spilled input image for each queued job
+        self._job_data: Dict[str, str] = {}
+        # (top_k, cam_layers, cache_key, image_hash) for each queued job
+        self._job_params: Dict[str, JobParams] = {}
+        self._job_queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def add_job(
+        self,
+        job: JobRecord,
+        image_path: Optional[str] = None,
+        params: Optional[JobParams] = None,
+    ) -> None:
+        async with self._lock:
+            self._jobs[job.job_id] = job
+            if image_path is not None:
+                self._job_data[job.job_id] = image_path
+            if params is not None:
+                self._job_params[job.job_id] = params
+
+    async def get_job(self, job_id: str) -> Optional[JobRecord]:
+        async with self._lock:
+            return self._jobs.get(job_id)
+
+    async def update_job(self, job_id: str, **fields: Any) -> None:
+        async with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                for name, value in fields.items():
+                    setattr(job, name, value)
+
+    async def get_job_input(self, job_id: str) -> Tuple[Optional[str], Optional[JobParams]]:
+        async with self._lock:
+            return self._job_data.get(job_id), self._job_params.get(job_id)
+
+    async def discard_job_input(self, job_id: str) -> None:
+        async with self._lock:
+            self._job_data.pop(job_id, None)
+            self._job_params.pop(job_id, None)
+
+    async def enqueue(self, job_id: str) -> None:
+        await self._job_queue.put(job_id)
+
+    async def dequeue(self) -> Optional[str]:
+        job_id = await self._job_queue.get()
+        if job_id is None:
+            # Shutdown sentinel from interrupt()
+            self._job_queue.task_done()
+        return job_id
+
+    async def task_done(self, job_id: str) -> None:
+        self._job_queue.task_done()
+
+    async def interrupt(self) -> None:
+        await self._job_queue.put(None)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._jobs.clear()
+            self._job_data.clear()
+            self._job_params.clear()
+        # Drop queued IDs, but keep shutdown sentinels so blocked workers still wake up
+        sentinels = 0
+        while not self._job_queue.empty():
+            if self._job_queue.get_nowait() is None:
+                sentinels += 1
+            self._job_queue.task_done()
+        for _ in range(sentinels):
+            self._job_queue.put_nowait(None)
+
+
+class RedisJobStore(JobStore):
+    """
+    Redis-backed job store.
+
+    Each job is a hash at ``job:{job_id}`` holding the JSON-encoded JobRecord and,
+    while queued, its input path and params. The queue is a Redis stream consumed
+    through a consumer group, so several worker processes can share it and each
+    job is delivered to one of them (acknowledged with XACK and deleted from the
+    stream once processed).
+
+    Jobs delivered to a worker that died before acknowledging them stay pending in
+    the group. dequeue() reclaims them with XAUTOCLAIM once they've been idle for
+    claim_idle_seconds (checked on the first call, i.e. at startup, and then every
+    CLAIM_INTERVAL_SECONDS) and runs them again, or marks them FAILED once they've
+    been delivered max_deliveries times. Job hashes expire job_ttl seconds after
+    the job is created.
+
+    Input images are referenced by path, so all replicas must share STORAGE_DIR.
+    """
+
+    STREAM = "jobs"
+    GROUP = "cnn-workers"
+    BLOCK_MS = 1000  # dequeue() timeout, bounds how long shutdown waits
+    CLAIM_INTERVAL_SECONDS = 30.0  # How often dequeue() looks for abandoned jobs
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 50,
+        job_ttl: int = 86400,
+        claim_idle_seconds: float = 600,
+        max_deliveries: int = 3,
+        client: Optional[Any] = None,
+    ):
+        """
+        Initialize Redis client (connections are opened lazily on first command).
+
+        Args:
+            url: Redis connection URL (e.g., redis://localhost:6379/0)
+            max_connections: Size of the connection pool shared by API handlers and
+                workers; callers wait for a free connection instead of failing
+            job_ttl: Seconds job hashes are kept after creation (0 = never expire)
+            claim_idle_seconds: Idle time after which another worker's unacknowledged
+                job is reclaimed
+            max_deliveries: Deliveries after which a reclaimed job is marked FAILED
+                instead of being run again
+            client: redis.asyncio client (with decode_responses=True) to use instead
+                of connecting to url, e.g. fakeredis in tests
+        """
+        import redis.asyncio as redis
+
+        if client is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                url, max_connections=max_connections, decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
+        self._redis = client
+        self._response_error = redis.ResponseError
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._job_ttl = job_ttl
+        self._claim_idle_ms = int(claim_idle_seconds * 1000)
+        self._max_deliveries = max_deliveries
+        self._next_claim = 0.0  # time.monotonic() of the next abandoned job check
+        self._group_ready = False
+        self._pending: Dict[str, str] = {}  # job_id -> stream message id awaiting XACK
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    async def add_job(
+        self,
+        job: JobRecord,
+        image_path: Optional[str] = None,
+        params: Optional[JobParams] = None,
+    ) -> None:
+        mapping = {"record": job.model_dump_json()}
+        if image_path is not None:
+            mapping["image_path"] = image_path
+        if params is not None:
+            mapping["params"] = json.dumps(params)
+        key = self._key(job.job_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if self._job_ttl > 0:
+                # Later HSET/HDEL keep the TTL, so it counts from job creation
+                pipe.expire(key, self._job_ttl)
+            await pipe.execute()
+
+    async def get_job(self, job_id: str) -> Optional[JobRecord]:
+        raw = await self._redis.hget(self._key(job_id), "record")
+        if raw is None:
+            return None
+        return JobRecord.model_validate_json(raw)
+
+    async def update_job(self, job_id: str, **fields: Any) -> None:
+        # Read-modify-write is safe here: only the worker processing a job updates it
+        job = await self.get_job(job_id)
+        if job:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            await self._redis.hset(self._key(job_id), "record", job.model_dump_json())
+
+    async def get_job_input(self, job_id: str) -> Tuple[Optional[str], Optional[JobParams]]:
+        key = self._key(job_id)
+        image_path, raw_params = await self._redis.hmget(key, ["image_path", "params"])
+        params = None
+        if raw_params is not None:
+            top_k, cam_layers, cache_key, image_hash = json.loads(raw_params)
+            params = (top_k, cam_layers, cache_key, image_hash)
+        return image_path, params
+
+    async def discard_job_input(self, job_id: str) -> None:
+        await self._redis.hdel(self._key(job_id), "image_path", "params")
+
+    async def _ensure_group(self) -> None:
+        """Create the stream and consumer group on first use."""
+        if self._group_ready:
+            return
+        try:
+            await self._redis.xgroup_create(self.STREAM, self.GROUP, id="0", mkstream=True)
+        except self._response_error as e:
+            # BUSYGROUP: another replica already created it
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, job_id: str) -> None:
+        await self._ensure_group()
+        await self._redis.xadd(self.STREAM, {"job_id": job_id})
+
+    async def dequeue(self) -> Optional[str]:
+        await self._ensure_group()
+
+        now = time.monotonic()
+        if now >= self._next_claim:
+            self._next_claim = now + self.CLAIM_INTERVAL_SECONDS
+            job_id = await self._claim_abandoned()
+            if job_id is not None:
+                # There may be more; check again on the next call
+                self._next_claim = 0.0
+                return job_id
+
+        try:
+            response = await self._redis.xreadgroup(
+                self.GROUP,
+                self._consumer,
+                {self.STREAM: ">"},
+                count=1,
+                block=self.BLOCK_MS,
+            )
+        except self._response_error as e:
+            # NOGROUP: the stream was deleted (clear()); recreate it on the next call
+            if "NOGROUP" not in str(e):
+                raise
+            self._group_ready = False
+            return None
+        if not response:
+            return None
+
+        _, messages = response[0]
+        message_id, message = messages[0]
+        job_id = message["job_id"]
+        self._pending[job_id] = message_id
+        return job_id
+
+    async def _claim_abandoned(self) -> Optional[str]:
+        """
+        Take over the oldest job left pending by a dead worker.
+
+        Jobs that already finished (or whose record expired) are only
+        acknowledged; jobs delivered more than max_deliveries times are marked
+        FAILED, so one that keeps crashing its worker isn't retried forever.
+
+        Returns:
+            Job ID to run again, or None if no job has been idle long enough
+        """
+        while True:
+            _, messages, *_ = await self._redis.xautoclaim(
+                self.STREAM,
+                self.GROUP,
+                self._consumer,
+                min_idle_time=self._claim_idle_ms,
+                start_id="0-0",
+                count=1,
+            )
+            if not messages:
+                return None
+
+            message_id, message = messages[0]
+            job_id = message.get("job_id") if message else None
+            job = await self.get_job(job_id) if job_id else None
+            if job is None or job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                # Trimmed entry, expired record, or the worker died right before XACK
+                await self._ack(message_id)
+                continue
+
+            pending = await self._redis.xpending_range(
+                self.STREAM, self.GROUP, min=message_id, max=message_id, count=1
+            )
+            deliveries = pending[0]["times_delivered"] if pending else 1
+            if deliveries > self._max_deliveries:
+                logger.error(
+                    "Job %s abandoned after %d deliveries, marking it failed", job_id, deliveries
+                )
+                await self.update_job(
+                    job_id,
+                    status=JobStatus.FAILED,
+                    message="Error: Job was interrupted too many times",
+                )
+                await self.discard_job_input(job_id)
+                await self._ack(message_id)
+                continue
+
+            logger.warning("Reclaimed abandoned job %s (delivery %d)", job_id, deliveries)
+            self._pending[job_id] = message_id
+            return job_id
+
+    async def _ack(self, message_id: str) -> None:
+        """Acknowledge a stream entry and delete it, so the stream doesn't grow without bound."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.STREAM, self.GROUP, message_id)
+            pipe.xdel(self.STREAM, message_id)
+            await pipe.execute()
+
+    async def task_done(self, job_id: str) -> None:
+        message_id = self._pending.pop(job_id, None)
+        if message_id is not None:
+            await self._ack(message_id)
+
+    async def interrupt(self) -> None:
+        # dequeue() times out after BLOCK_MS, nothing to wake up
+        pass
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match="job:*", count=500)]
+        if keys:
+            await self._redis.delete(*keys)
+        # Dropping the stream also drops its consumer group; it's recreated on next use
+        await self._redis.delete(self.STREAM)
+        self._group_ready = False
+        self._pending.clear()
+
+
+def create_job_store() -> JobStore:
+    """Create the job store selected by settings.JOB_STORE_BACKEND."""
+    if settings.JOB_STORE_BACKEND == "redis":
+        logger.info("Using Redis job store")
+        return RedisJobStore(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            job_ttl=settings.REDIS_JOB_TTL_SECONDS,
+            claim_idle_seconds=settings.REDIS_CLAIM_IDLE_SECONDS,
+            max_deliveries=settings.REDIS_MAX_DELIVERIES,
+        )
+    return MemoryJobStore()
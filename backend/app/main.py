@@ -6,25 +6,44 @@ import os
 import time
 from pathlib import Path
 
+import torch
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.routes import router as v1_router
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.jobs.service import job_service
-from app.models.loaders import load_model, remove_from_cache
+from app.models.loaders import preload_models
 from app.models.registry import get_all_model_ids
 
 # Setup structured logging
 setup_logging()
 logger = logging.getLogger("app")
 
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files served with long-lived cache headers.
+
+    Every asset lives under a per-job UUID directory and is written once, so
+    browsers (and any CDN in front of the API) can cache it indefinitely
+    instead of re-requesting each feature map PNG.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
 app = FastAPI(
     title="ConvLens API",
     description="Backend API for CNN visualization and analysis",
     version="1.0.0",
+    # orjson serializes the nested job result payload several times faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration
@@ -42,7 +61,7 @@ app.include_router(v1_router, prefix="/api/v1", tags=["v1"])
 # Mount static file server for storage directory
 # Ensure storage directory exists
 settings.STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-app.mount("/static", StaticFiles(directory=str(settings.STORAGE_DIR)), name="static")
+app.mount("/static", ImmutableStaticFiles(directory=str(settings.STORAGE_DIR)), name="static")
 
 
 @app.get("/health")
@@ -105,25 +124,15 @@ async def startup_event():
         strategy = settings.PRELOAD_STRATEGY
         logger.info(f"Preload strategy: {strategy}")
 
-        for model_id in model_ids_to_preload:
-            model_start = time.time()
-            try:
-                if strategy == "download_only":
-                    # Load model to download weights, then free memory
-                    model = load_model(model_id)
-                    # Remove from cache immediately to free RAM
-                    remove_from_cache(model_id)
-                    del model
-                    gc.collect()
-                    model_time = (time.time() - model_start) * 1000
-                    logger.info(f"Preloaded model weights: {model_id} ({model_time:.1f}ms)")
-                elif strategy == "load_into_ram":
-                    # Load and keep in cache (existing logic)
-                    load_model(model_id)
-                    model_time = (time.time() - model_start) * 1000
-                    logger.info(f"Preloaded and cached model: {model_id} ({model_time:.1f}ms)")
-            except Exception as e:
-                logger.error(f"Failed to preload model {model_id}: {e}")
+        # download_only fetches weights to TORCH_HOME without keeping models in RAM
+        preload_models(model_ids_to_preload, keep_in_memory=(strategy == "load_into_ram"))
+
+        if strategy == "download_only":
+            # Refcounting frees each model on `del`; one collection sweeps any cycles
+            # left behind instead of a full GC walk per model
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
 
         total_time = (time.time() - preload_start) * 1000
         logger.info(f"Model preloading complete ({len(model_ids_to_preload)} models, {total_time:.1f}ms)")
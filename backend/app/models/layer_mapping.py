@@ -1,43 +1,48 @@
 """Layer mapping utilities for model-specific default CAM layers."""
 
 import logging
-from typing import List
+from functools import lru_cache
+from typing import Tuple
 
 from app.models.registry import get_model_config
 
 logger = logging.getLogger("app.models.layer_mapping")
 
 
-def get_default_cam_layers(model_id: str) -> List[str]:
+@lru_cache(maxsize=None)
+def get_default_cam_layers(model_id: str) -> Tuple[str, ...]:
     """
     Get model-specific default CAM layers from the registry.
 
     Reads from model_registry.yaml and returns the layers_to_hook list
-    (or a subset) as defaults for Grad-CAM computation.
+    (or a subset) as defaults for Grad-CAM computation. Results are cached
+    per model_id without a bound (one entry per registry model; callers
+    validate model_id first) and a tuple is returned so the
+    cached value can't be mutated by callers.
 
     Args:
         model_id: Model identifier (e.g., "resnet18", "mobilenet_v2")
 
     Returns:
-        List of layer paths to use for Grad-CAM (e.g., ["conv1", "layer1", ...] or ["features.0", "features.2", ...])
-        Returns empty list if model config not found or layers_to_hook missing
+        Tuple of layer paths to use for Grad-CAM (e.g., ("conv1", "layer1", ...) or ("features.0", "features.2", ...))
+        Returns empty tuple if model config not found or layers_to_hook missing
     """
     model_config = get_model_config(model_id)
 
     if model_config is None:
         logger.warning(f"Model config not found for {model_id}, returning empty CAM layers list")
-        return []
+        return ()
 
     layers_to_hook = model_config.get("layers_to_hook", [])
 
     if not layers_to_hook:
         logger.warning(f"No layers_to_hook found in model config for {model_id}, returning empty CAM layers list")
-        return []
+        return ()
 
     # Return all layers from layers_to_hook as defaults
     # This ensures we use model-specific paths (e.g., features.0 for MobileNetV2, conv1 for ResNet)
     logger.debug(f"Using default CAM layers for {model_id}: {layers_to_hook}")
-    return layers_to_hook.copy()
+    return tuple(layers_to_hook)
 
 
 def get_cam_target_path(layer_name: str, model_id: str) -> str:
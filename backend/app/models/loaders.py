@@ -1,12 +1,16 @@
 """Model loading and preprocessing utilities."""
 
+import gc
 import io
 import logging
+import os
+import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import torch
-import torchvision
-import torchvision.transforms as transforms
 from PIL import Image
 
 from app.core.config import settings
@@ -17,21 +21,158 @@ logger = logging.getLogger("app.models.loaders")
 # In-memory LRU cache for loaded models (OrderedDict for LRU behavior)
 _model_cache: OrderedDict[str, torch.nn.Module] = OrderedDict()
 
+# Guards _model_cache/_model_bytes/_compiled_cache mutations (preload_models loads from several threads)
+_cache_lock = threading.RLock()
+
+# Serializes torch.compile warmups and model exports; compiling from several threads at once isn't safe
+_compile_lock = threading.RLock()
+
+# Parameter + buffer bytes of each cached model, and their running total
+_model_bytes: Dict[str, int] = {}
+_model_cache_bytes: int = 0
+
+# LRU of preprocessed input tensors keyed by (image fingerprint, model_id)
+_preproc_cache: OrderedDict[Tuple[str, str], torch.Tensor] = OrderedDict()
+_preproc_lock = threading.Lock()
+
+# Preprocessing configs per model_id (built on first use from registry config)
+_preprocess_cache: Dict[str, "_PreprocessConfig"] = {}
+
+# torch.compile wrappers sharing weights with cached models (COMPILE_MODELS), or
+# AOTInductor runners loaded from disk (EXPORT_MODELS)
+_compiled_cache: Dict[str, Callable[[torch.Tensor], torch.Tensor]] = {}
+
+# Pinned host copies of evicted models' state dicts (LRU, CUDA only), so reloading
+# an evicted model is a single H2D copy instead of a torch.load from disk
+_pinned_weights: OrderedDict[str, Dict[str, torch.Tensor]] = OrderedDict()
+
 
 def _get_cache_max() -> int:
     """Get MODEL_CACHE_MAX from settings at runtime (lazy getter)."""
     return settings.MODEL_CACHE_MAX
 
 
+def _model_nbytes(model: torch.nn.Module) -> int:
+    """Get the memory footprint of a model's parameters and buffers in bytes."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _cache_model(model_id: str, model: torch.nn.Module) -> None:
+    """Add model to the end (most recently used) of the cache and record its size."""
+    global _model_cache_bytes
+    nbytes = _model_nbytes(model)
+    with _cache_lock:
+        _model_cache[model_id] = model
+        _model_cache.move_to_end(model_id)
+        _model_cache_bytes += nbytes - _model_bytes.get(model_id, 0)
+        _model_bytes[model_id] = nbytes
+
+
 def remove_from_cache(model_id: str) -> None:
     """Remove model from cache (used during preloading with download_only strategy)."""
-    global _model_cache
-    if model_id in _model_cache:
-        del _model_cache[model_id]
+    global _model_cache_bytes
+    with _cache_lock:
+        _model_cache.pop(model_id, None)
+        _compiled_cache.pop(model_id, None)
+        _model_cache_bytes -= _model_bytes.pop(model_id, 0)
+
+
+def _cache_over_limit() -> bool:
+    """Check whether the cache exceeds MODEL_CACHE_MAX or MODEL_CACHE_MAX_BYTES."""
+    if len(_model_cache) > _get_cache_max():
+        return True
+    max_bytes = settings.MODEL_CACHE_MAX_BYTES
+    return max_bytes > 0 and _model_cache_bytes > max_bytes
+
+
+def _pinned_pool_enabled() -> bool:
+    """Check whether evicted weights should be kept in pinned host memory."""
+    return settings.PINNED_WEIGHT_POOL_MAX > 0 and settings.DEVICE.startswith("cuda")
+
+
+def _stash_pinned_weights(model_id: str, model: torch.nn.Module) -> None:
+    """
+    Copy a model's state dict into pinned host memory before it's evicted.
+
+    Weights never change after loading, so a model already in the pool is not
+    copied again. The pool is bounded by PINNED_WEIGHT_POOL_MAX entries (LRU).
+    Must be called with _cache_lock held.
+    """
+    if model_id in _pinned_weights:
+        _pinned_weights.move_to_end(model_id)
+        return
+
+    _pinned_weights[model_id] = {
+        # empty_like keeps the channels_last layout, so reloads need no reshaping
+        name: torch.empty_like(tensor, device="cpu", pin_memory=True).copy_(tensor)
+        for name, tensor in model.state_dict().items()
+    }
+    while len(_pinned_weights) > settings.PINNED_WEIGHT_POOL_MAX:
+        _pinned_weights.popitem(last=False)
+
+
+def _load_from_pinned_weights(model_id: str) -> Optional[torch.nn.Module]:
+    """
+    Rebuild a previously evicted model from its pinned host weights.
+
+    The module skeleton is built on the meta device (no weight allocation or
+    random init) and the pinned tensors are copied to settings.DEVICE and
+    assigned in place of its parameters.
+
+    Returns:
+        Model in eval mode on settings.DEVICE, or None if the model isn't pooled
+    """
+    with _cache_lock:
+        pinned = _pinned_weights.get(model_id)
+        if pinned is None:
+            return None
+        _pinned_weights.move_to_end(model_id)
+
+    import torchvision
+
+    with torch.device("meta"):
+        model = getattr(torchvision.models, model_id)(weights=None)
+    state_dict = {name: tensor.to(settings.DEVICE, non_blocking=True) for name, tensor in pinned.items()}
+    model.load_state_dict(state_dict, assign=True)
+    model.eval()
+    return model
+
+
+def _evict_models() -> None:
+    """
+    Evict least recently used models until the cache is within its limits.
+
+    The most recently used model is always kept, even if it alone exceeds
+    MODEL_CACHE_MAX_BYTES. On CUDA, evicted weights are kept in the pinned
+    host pool (see PINNED_WEIGHT_POOL_MAX) before the device copy is freed.
+    """
+    evicted = False
+    with _cache_lock:
+        while len(_model_cache) > 1 and _cache_over_limit():
+            oldest_key = next(iter(_model_cache))
+            if _pinned_pool_enabled():
+                _stash_pinned_weights(oldest_key, _model_cache[oldest_key])
+            remove_from_cache(oldest_key)
+            evicted = True
+            logger.debug(
+                f"Evicted model from cache: {oldest_key} "
+                f"(cache size: {len(_model_cache)}/{_get_cache_max()}, {_model_cache_bytes / 1e6:.0f}MB)"
+            )
+
+    if evicted:
+        # Free the evicted weights now instead of at the next GC cycle
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
 
 
 def _get_model_mapping():
     """Get model_id to torchvision model loading function mapping."""
+    # torchvision is imported lazily throughout this module: importing it pulls in every
+    # model definition (~1s), which shouldn't delay app startup
+    import torchvision
+
     return {
         "resnet18": lambda: torchvision.models.resnet18(weights="DEFAULT"),
         "resnet34": lambda: torchvision.models.resnet34(weights="DEFAULT"),
@@ -52,26 +193,29 @@ def load_model(model_id: str) -> torch.nn.Module:
     """
     Load a PyTorch model from torchvision with pretrained weights.
 
-    Models are cached in-memory with LRU eviction and moved to CPU in eval mode.
+    Models are cached in-memory with LRU eviction and moved to settings.DEVICE in eval mode.
 
     Args:
         model_id: Model identifier (resnet18, mobilenet_v2, efficientnet_b0)
 
     Returns:
-        Loaded PyTorch model in eval mode on CPU
+        Loaded PyTorch model in eval mode on settings.DEVICE
 
     Raises:
         ValueError: If model_id is not supported
     """
-    import time
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Check cache first (LRU: move to end on access)
-    if model_id in _model_cache:
-        _model_cache.move_to_end(model_id)
-        load_time = (time.time() - start_time) * 1000
-        logger.info(f"Model cache hit: {model_id} ({load_time:.1f}ms)")
-        return _model_cache[model_id]
+    with _cache_lock:
+        model = _model_cache.get(model_id)
+        if model is not None:
+            _model_cache.move_to_end(model_id)
+    if model is not None:
+        # Hot path: only compute the timing and format the message if INFO is enabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Model cache hit: %s (%.1fms)", model_id, (time.perf_counter() - start_time) * 1000)
+        return model
 
     # Verify model exists in registry
     model_config = get_model_config(model_id)
@@ -85,40 +229,154 @@ def load_model(model_id: str) -> torch.nn.Module:
     if model_id not in model_mapping:
         raise ValueError(f"Unsupported model_id: {model_id}. Supported: {list(model_mapping.keys())}")
 
-    # Load model (this will download weights if not cached)
-    model = model_mapping[model_id]()
-
-    # Move to CPU and set to eval mode
-    model = model.cpu()
-    model.eval()
+    model = _load_from_pinned_weights(model_id) if _pinned_pool_enabled() else None
+    if model is None:
+        # Load model (this will download weights if not cached)
+        model = model_mapping[model_id]()
 
-    # LRU cache: add to end, evict oldest if over limit
-    _model_cache[model_id] = model
-    _model_cache.move_to_end(model_id)
+        # Move to configured device in channels_last layout (faster conv2d kernels) and set to eval mode
+        model = model.to(settings.DEVICE, memory_format=torch.channels_last)
+        model.eval()
 
-    # Evict oldest if cache is full
-    cache_max = _get_cache_max()
-    if len(_model_cache) > cache_max:
-        oldest_key = next(iter(_model_cache))
-        del _model_cache[oldest_key]
-        logger.debug(f"Evicted model from cache: {oldest_key} (cache size: {len(_model_cache)}/{cache_max})")
+    # LRU cache: add to end, evict oldest while over the count or byte limit
+    _cache_model(model_id, model)
+    _evict_models()
 
-    load_time = (time.time() - start_time) * 1000
-    logger.info(f"Loaded and cached model: {model_id} ({load_time:.1f}ms)")
+    logger.info("Loaded and cached model: %s (%.1fms)", model_id, (time.perf_counter() - start_time) * 1000)
 
     return model
 
 
-def preload_model(model_id: str) -> None:
+def _exported_model_path(model_id: str):
+    """Get the on-disk path of a model's AOTInductor package."""
+    import torchvision
+
+    # Packages embed the weights and device-specific kernels; key them on everything
+    # that changes either so a stale package is never loaded
+    device_type = torch.device(settings.DEVICE).type
+    name = (
+        f"{model_id}-{device_type}-b{settings.INFERENCE_MAX_BATCH}"
+        f"-torch{torch.__version__}-tv{torchvision.__version__}.pt2"
+    )
+    return settings.EXPORTED_MODELS_DIR / name
+
+
+def _load_exported_model(model_id: str, model: torch.nn.Module) -> Callable[[torch.Tensor], torch.Tensor]:
+    """
+    Load a model's AOTInductor package, exporting and compiling it on first use.
+
+    The package is built with torch.export (batch dimension dynamic up to
+    INFERENCE_MAX_BATCH) and AOTInductor, and saved under EXPORTED_MODELS_DIR
+    so later processes only pay the load.
+
+    Args:
+        model_id: Model identifier
+        model: Cached eager model to export
+
+    Returns:
+        Callable running the compiled forward pass on settings.DEVICE
+    """
+    import torch._inductor
+
+    path = _exported_model_path(model_id)
+    with _compile_lock:
+        if not path.exists():
+            start_time = time.perf_counter()
+            logger.info("Exporting model %s to %s", model_id, path)
+            input_size = get_model_config(model_id)["input_size"]
+            # Example batch of 2: torch.export specializes dimensions of size 1
+            example = torch.zeros(2, 3, *input_size, device=settings.DEVICE)
+            example = example.contiguous(memory_format=torch.channels_last)
+            batch = torch.export.Dim("batch", min=1, max=max(2, settings.INFERENCE_MAX_BATCH))
+            with torch.inference_mode():
+                exported = torch.export.export(model, (example,), dynamic_shapes=({0: batch},))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write under a temporary name so other replicas never load a partial package
+                tmp_path = path.with_name(f".{os.getpid()}-{path.name}")
+                torch._inductor.aoti_compile_and_package(exported, package_path=str(tmp_path))
+            os.replace(tmp_path, path)
+            logger.info("Exported model %s (%.1fs)", model_id, time.perf_counter() - start_time)
+
+    return torch._inductor.aoti_load_package(str(path))
+
+
+def get_inference_model(model_id: str) -> Callable[[torch.Tensor], torch.Tensor]:
+    """
+    Get the callable to use for plain forward passes (predictions, no hooks).
+
+    When COMPILE_MODELS is enabled this returns a torch.compile wrapper (using
+    COMPILE_MODE) around the cached model (weights are shared, not copied).
+    Otherwise, when EXPORT_MODELS is enabled, it returns an AOTInductor runner
+    loaded from EXPORTED_MODELS_DIR (holding its own copy of the weights).
+    Feature map and Grad-CAM code must keep using load_model(): compiled graphs
+    don't run module hooks and recompile whenever hooks change.
+
+    Args:
+        model_id: Model identifier
+
+    Returns:
+        Compiled wrapper or exported runner if enabled, otherwise the cached eager model
+    """
+    model = load_model(model_id)
+    if not (settings.COMPILE_MODELS or settings.EXPORT_MODELS):
+        return model
+
+    compiled = _compiled_cache.get(model_id)
+    if compiled is None:
+        if settings.COMPILE_MODELS:
+            # Input shape is fixed per model in the registry, so specialize on it
+            compiled = torch.compile(model, mode=settings.COMPILE_MODE, dynamic=False)
+        else:
+            compiled = _load_exported_model(model_id, model)
+        _compiled_cache[model_id] = compiled
+    return compiled
+
+
+def warmup_model(model_id: str) -> None:
+    """
+    Run one dummy forward pass so one-time costs happen off the request path.
+
+    Covers lazy backend initialization (oneDNN primitives on CPU), priming the
+    caching allocator and cuDNN autotuning on CUDA, and compilation/export when
+    COMPILE_MODELS or EXPORT_MODELS is set.
+
+    Args:
+        model_id: Model identifier
+
+    Raises:
+        ValueError: If model_id not found in registry
+    """
+    model_config = get_model_config(model_id)
+    if model_config is None:
+        raise ValueError(f"Model '{model_id}' not found in registry")
+
+    # Same shape, layout and grad mode as InferenceService forwards so compiled guards match
+    dummy_input = torch.zeros(1, 3, *model_config["input_size"], device=settings.DEVICE)
+    dummy_input = dummy_input.contiguous(memory_format=torch.channels_last)
+    with _compile_lock:
+        # Resolve outside inference mode: on a cache miss load_model() builds the model
+        # here, and weights created under inference mode can't be used by Grad-CAM
+        runner = get_inference_model(model_id)
+        with torch.inference_mode():
+            runner(dummy_input)
+    if dummy_input.is_cuda:
+        # Wait for the queued kernels so startup logs reflect the real warmup cost
+        torch.cuda.synchronize(dummy_input.device)
+
+
+def preload_model(model_id: str, keep_in_memory: bool = True) -> None:
     """
     Preload a model by downloading its weights (if not already cached).
 
     This function downloads model weights to the torch cache directory (TORCH_HOME),
     but does not necessarily keep the model in memory if the cache is full.
     The model will be available for fast loading later via load_model().
+    Safe to call from several threads (see preload_models()).
 
     Args:
         model_id: Model identifier (resnet18, mobilenet_v2, efficientnet_b0)
+        keep_in_memory: Keep the model in the in-memory cache if there's room
+            (False only downloads the weights)
 
     Raises:
         ValueError: If model_id is not supported
@@ -136,88 +394,282 @@ def preload_model(model_id: str) -> None:
         return
 
     # If model is already in cache, skip
-    if model_id in _model_cache:
-        logger.debug(f"Model {model_id} already in cache, skipping preload")
-        return
+    with _cache_lock:
+        if model_id in _model_cache:
+            logger.debug(f"Model {model_id} already in cache, skipping preload")
+            return
 
     try:
-        logger.info(f"Preloading model: {model_id}")
+        start_time = time.perf_counter()
+        logger.info("Preloading model: %s", model_id)
         # Load model (this will download weights if not cached)
         # torchvision handles caching to TORCH_HOME automatically
         model = model_mapping[model_id]()
-        model = model.cpu()
+        if not keep_in_memory:
+            # Download only: the model is discarded, so don't copy it to the device or relayout it
+            del model
+            logger.info(
+                "Preloaded model weights for %s (%.1fms, not kept in memory, download only)",
+                model_id, (time.perf_counter() - start_time) * 1000,
+            )
+            return
+        model = model.to(settings.DEVICE, memory_format=torch.channels_last)
         model.eval()
 
         # Add to cache if there's room, otherwise just discard (weights are cached to disk)
-        cache_max = _get_cache_max()
-        if len(_model_cache) < cache_max:
-            _model_cache[model_id] = model
-            _model_cache.move_to_end(model_id)
-            logger.info(f"Preloaded and cached model: {model_id}")
+        max_bytes = settings.MODEL_CACHE_MAX_BYTES
+        nbytes = _model_nbytes(model)
+        with _cache_lock:
+            # Room check and insert are atomic so concurrent preloads can't overfill the cache
+            has_room = len(_model_cache) < _get_cache_max() and (
+                max_bytes <= 0 or _model_cache_bytes + nbytes <= max_bytes
+            )
+            if has_room:
+                _cache_model(model_id, model)
+
+        load_time = (time.perf_counter() - start_time) * 1000
+        if has_room:
+            if settings.WARMUP_MODELS or settings.COMPILE_MODELS or settings.EXPORT_MODELS:
+                # Pay the warmup / compilation / export cost now rather than on the first job
+                warmup_model(model_id)
+            logger.info("Preloaded and cached model: %s (%.1fms)", model_id, load_time)
         else:
             # Weights are downloaded, but don't keep in memory
             del model
-            logger.info(f"Preloaded model weights for {model_id} (not kept in memory, cache full)")
+            logger.info("Preloaded model weights for %s (%.1fms, not kept in memory, cache full)", model_id, load_time)
     except Exception as e:
         logger.error(f"Failed to preload model {model_id}: {e}")
 
 
-def preprocess_image(image_bytes: bytes, model_id: str) -> torch.Tensor:
+def preload_models(model_ids: List[str], keep_in_memory: bool = True) -> None:
     """
-    Preprocess image bytes for model input.
+    Preload several models concurrently.
+
+    Runs preload_model() on a thread pool of settings.PRELOAD_WORKERS threads so
+    weight downloads overlap with deserialization of other models. The pool is
+    kept small to avoid hammering the weights download server.
+
+    Args:
+        model_ids: Model identifiers to preload
+        keep_in_memory: Keep models in the in-memory cache while there's room
+            (False only downloads the weights)
+    """
+    if not model_ids:
+        return
+
+    workers = min(settings.PRELOAD_WORKERS, len(model_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preload") as pool:
+        # preload_model() logs its own failures, so just wait for all of them
+        list(pool.map(lambda model_id: preload_model(model_id, keep_in_memory), model_ids))
+
+
+def _sniff(image_bytes: bytes) -> Optional[str]:
+    """
+    Detect the image format from its magic bytes.
+
+    Returns:
+        "jpeg", "png" or "webp", or None for anything else
+    """
+    if image_bytes[:2] == b"\xff\xd8":
+        return "jpeg"
+    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+# torchvision.io decoders that return tensors directly (no PIL plugin lookup)
+_TENSOR_DECODERS = {
+    "jpeg": "decode_jpeg",
+    "png": "decode_png",
+    "webp": "decode_webp",
+}
+
+
+def decode_image(image_bytes: bytes) -> torch.Tensor:
+    """
+    Decode image bytes to an RGB uint8 tensor.
+
+    The format is sniffed from the magic bytes: JPEG (libjpeg-turbo), PNG and WebP
+    are decoded by torchvision straight into a tensor; other formats (and 16-bit
+    PNGs) fall back to PIL.
+
+    Args:
+        image_bytes: Raw image file bytes
+
+    Returns:
+        uint8 tensor with shape [3, H, W]
+
+    Raises:
+        IOError: If image_bytes cannot be decoded
+    """
+    image_format = _sniff(image_bytes)
+    try:
+        decoder_name = _TENSOR_DECODERS.get(image_format)
+        if decoder_name is not None:
+            import torchvision.io
+
+            # bytearray gives frombuffer a writable buffer (no warning); decoders only read it
+            data = torch.frombuffer(bytearray(image_bytes), dtype=torch.uint8)
+            decoder = getattr(torchvision.io, decoder_name)
+            tensor = decoder(data, mode=torchvision.io.ImageReadMode.RGB)
+            if tensor.dtype == torch.uint8:
+                return tensor
+            # 16-bit PNG: let PIL reduce it to 8-bit RGB below
+
+        formats = [image_format.upper()] if image_format else None
+        return _pil_to_rgb_tensor(Image.open(io.BytesIO(image_bytes), formats=formats))
+    except Exception as e:
+        raise IOError(f"Failed to decode image: {e}")
+
+
+def _pil_to_rgb_tensor(image: Image.Image) -> torch.Tensor:
+    """Convert a PIL image to an RGB uint8 tensor [3, H, W]."""
+    # Convert to RGB if necessary (handle PNG with alpha, etc.)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    import torchvision.transforms.v2.functional as F
+
+    return F.pil_to_tensor(image)
 
-    Steps:
-    1. Convert bytes to PIL Image
-    2. Resize smaller edge to input_size[0] (maintains aspect ratio)
-    3. Center crop to input_size [H, W]
-    4. Convert to tensor and normalize
-    5. Add batch dimension
+
+class _PreprocessConfig(NamedTuple):
+    """Per-model preprocessing parameters, precomputed once from the registry."""
+
+    resize: int  # Smaller edge is resized to this (maintains aspect ratio)
+    crop: List[int]  # Center crop size [H, W]
+    mean255: torch.Tensor  # mean * 255, shape [3, 1, 1]
+    inv_std255: torch.Tensor  # 1 / (std * 255), shape [3, 1, 1]
+
+
+def _get_preprocess_config(model_id: str) -> _PreprocessConfig:
+    """
+    Get the cached preprocessing config for a model, building it on first use.
 
     Args:
-        image_bytes: Image file bytes
         model_id: Model identifier to get preprocessing config from registry
 
     Returns:
-        Preprocessed tensor with shape [1, 3, H, W] ready for forward pass
+        Preprocessing config with normalization constants folded for uint8 input
 
     Raises:
         ValueError: If model_id not found in registry
-        IOError: If image_bytes cannot be decoded
     """
-    # Get model config from registry
+    config = _preprocess_cache.get(model_id)
+    if config is not None:
+        return config
+
     model_config = get_model_config(model_id)
     if model_config is None:
         raise ValueError(f"Model '{model_id}' not found in registry")
 
     input_size = model_config["input_size"]
     normalization = model_config["normalization"]
-    mean = normalization["mean"]
-    std = normalization["std"]
+    mean = torch.tensor(normalization["mean"], dtype=torch.float32).view(3, 1, 1)
+    std = torch.tensor(normalization["std"], dtype=torch.float32).view(3, 1, 1)
 
-    # Convert bytes to PIL Image
-    try:
-        image = Image.open(io.BytesIO(image_bytes))
-        # Convert to RGB if necessary (handle PNG with alpha, etc.)
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-    except Exception as e:
-        raise IOError(f"Failed to decode image: {e}")
+    # (x / 255 - mean) / std == (x - mean * 255) * (1 / (std * 255)), so uint8 input
+    # needs one subtract and one multiply
+    config = _PreprocessConfig(
+        resize=input_size[0],
+        crop=list(input_size),
+        mean255=mean * 255.0,
+        inv_std255=1.0 / (std * 255.0),
+    )
+    _preprocess_cache[model_id] = config
+    return config
 
-    # Create transforms
-    # Resize: resize the smaller edge to input_size[0], maintaining aspect ratio
-    # CenterCrop: crop to exact input_size [H, W]
-    transform = transforms.Compose([
-        transforms.Resize(input_size[0]),  # Resize smaller edge to input_size[0] (maintains aspect ratio)
-        transforms.CenterCrop(input_size),  # Center crop to [H, W]
-        transforms.ToTensor(),  # Convert to [0, 1] range and CHW format
-        transforms.Normalize(mean=mean, std=std),  # Normalize
-    ])
 
-    # Apply transforms
-    tensor = transform(image)
+def _preprocess_tensor(image: torch.Tensor, config: _PreprocessConfig) -> torch.Tensor:
+    """Resize, center crop and normalize a uint8 [3, H, W] tensor into a [1, 3, H, W] float batch."""
+    import torchvision.transforms.v2.functional as F
 
-    # Add batch dimension: [C, H, W] -> [1, C, H, W]
-    tensor = tensor.unsqueeze(0)
+    image = F.resize(image, config.resize, antialias=True)
+    image = F.center_crop(image, config.crop)
+    # .to() makes the one (contiguous) float copy; the in-place ops reuse its storage
+    image = image.to(torch.float32, memory_format=torch.contiguous_format)
+    return image.sub_(config.mean255).mul_(config.inv_std255).unsqueeze_(0)
 
-    return tensor
 
+def get_cached_input(image_key: str, model_id: str) -> Optional[torch.Tensor]:
+    """
+    Get a preprocessed input tensor from the LRU filled by preprocess_image().
+
+    Lets callers skip decoding entirely when an image was already preprocessed
+    for this model.
+
+    Args:
+        image_key: Content hash of the source image bytes (compute_image_hash)
+        model_id: Model identifier
+
+    Returns:
+        Cached tensor [1, 3, H, W] (shared, don't modify in place), or None on a
+        miss or when PREPROC_CACHE_MAX is 0
+    """
+    if settings.PREPROC_CACHE_MAX <= 0:
+        return None
+    cache_key = (image_key, model_id)
+    with _preproc_lock:
+        tensor = _preproc_cache.get(cache_key)
+        if tensor is not None:
+            _preproc_cache.move_to_end(cache_key)
+        return tensor
+
+
+def preprocess_image(
+    image: Union[bytes, Image.Image, torch.Tensor],
+    model_id: str,
+    image_key: Optional[str] = None,
+) -> torch.Tensor:
+    """
+    Preprocess an image for model input.
+
+    Steps:
+    1. Decode to an RGB uint8 tensor (skipped if an already decoded tensor is passed)
+    2. Resize smaller edge to input_size[0] (maintains aspect ratio)
+    3. Center crop to input_size [H, W]
+    4. Convert to float and normalize
+    5. Add batch dimension
+
+    Args:
+        image: Image file bytes, a PIL Image, or an RGB uint8 tensor [3, H, W]
+            from decode_image() (avoids a second decode)
+        model_id: Model identifier to get preprocessing config from registry
+        image_key: Content hash of the source image bytes (compute_image_hash). When
+            given, results are kept in an LRU of PREPROC_CACHE_MAX tensors keyed by
+            (image_key, model_id), so resubmitting an image skips preprocessing. Every
+            input type is decoded at full resolution, so the cached tensor doesn't
+            depend on which caller filled the cache.
+
+    Returns:
+        Preprocessed tensor with shape [1, 3, H, W] ready for forward pass (may be
+        shared with the cache, so callers must not modify it in place)
+
+    Raises:
+        ValueError: If model_id not found in registry
+        IOError: If image bytes cannot be decoded
+    """
+    config = _get_preprocess_config(model_id)
+
+    cache_max = settings.PREPROC_CACHE_MAX
+    cache_key = (image_key, model_id) if image_key is not None and cache_max > 0 else None
+    if cache_key is not None:
+        tensor = get_cached_input(image_key, model_id)
+        if tensor is not None:
+            return tensor
+
+    if isinstance(image, bytes):
+        image = decode_image(image)
+    elif isinstance(image, Image.Image):
+        image = _pil_to_rgb_tensor(image)
+
+    tensor = _preprocess_tensor(image, config)
+
+    if cache_key is not None:
+        with _preproc_lock:
+            _preproc_cache[cache_key] = tensor
+            while len(_preproc_cache) > cache_max:
+                _preproc_cache.popitem(last=False)
+
+    return tensor
@@ -1,7 +1,9 @@
 """Model registry for loading and accessing model configurations."""
 
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 import yaml
 
@@ -12,11 +14,39 @@ logger = logging.getLogger("app.models.registry")
 # Cache for loaded registry data
 _registry_cache: Optional[Dict[str, Any]] = None
 
+# Read-only model configs indexed by id (built together with _registry_cache)
+_model_index: Optional[Dict[str, Mapping[str, Any]]] = None
+
+
+def _load_baked_registry(raw: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Get the pre-parsed registry generated by scripts/bake_registry.py.
+
+    Args:
+        raw: Contents of the configured registry file
+
+    Returns:
+        Baked registry data, or None if the baked module is missing or was
+        generated from a different YAML file
+    """
+    try:
+        from app.models import _baked_registry
+    except ImportError:
+        return None
+
+    if hashlib.sha256(raw).hexdigest() != _baked_registry.SOURCE_SHA256:
+        logger.info("Baked model registry is stale, parsing YAML instead")
+        return None
+    return _baked_registry.MODELS
+
 
 def _load_registry() -> Dict[str, Any]:
     """
     Load model registry from YAML file.
 
+    Uses the baked copy of the registry when it matches the YAML file, which
+    skips YAML parsing at startup.
+
     Returns:
         Dictionary containing model registry data
 
@@ -24,7 +54,7 @@ def _load_registry() -> Dict[str, Any]:
         FileNotFoundError: If registry file doesn't exist
         yaml.YAMLError: If YAML parsing fails
     """
-    global _registry_cache
+    global _registry_cache, _model_index
 
     if _registry_cache is not None:
         return _registry_cache
@@ -35,12 +65,15 @@ def _load_registry() -> Dict[str, Any]:
         raise FileNotFoundError(f"Model registry file not found: {registry_path}")
 
     try:
-        with open(registry_path, "r") as f:
-            data = yaml.safe_load(f)
+        raw = registry_path.read_bytes()
+        data = _load_baked_registry(raw)
+        if data is None:
+            data = yaml.safe_load(raw)
 
         if not data or "models" not in data:
             raise ValueError("Invalid registry format: missing 'models' key")
 
+        _model_index = {model["id"]: MappingProxyType(model) for model in data["models"] if model.get("id")}
         _registry_cache = data
         logger.info(f"Loaded model registry from {registry_path}")
         return _registry_cache
@@ -78,23 +111,25 @@ def list_models() -> List[Dict[str, Any]]:
         return []
 
 
-def get_model_config(model_id: str) -> Optional[Dict[str, Any]]:
+def get_model_config(model_id: str) -> Optional[Mapping[str, Any]]:
     """
     Get full configuration for a specific model.
 
+    Looks the model up in the id index built with the registry and returns a
+    zero-copy read-only view of it. Callers that need a mutable dict must copy
+    it explicitly with dict(...).
+
     Args:
         model_id: Model identifier
 
     Returns:
-        Full model configuration dictionary, or None if not found
+        Read-only model configuration mapping, or None if not found
     """
     try:
-        registry = _load_registry()
-        models = registry.get("models", [])
-
-        for model in models:
-            if model.get("id") == model_id:
-                return model.copy()
+        _load_registry()
+        model = _model_index.get(model_id)
+        if model is not None:
+            return model
 
         logger.warning(f"Model not found in registry: {model_id}")
         return None
@@ -122,7 +157,13 @@ def get_all_model_ids() -> List[str]:
 
 def clear_cache() -> None:
     """Clear the registry cache (useful for testing or reloading)."""
-    global _registry_cache
+    global _registry_cache, _model_index
     _registry_cache = None
+    _model_index = None
+
+    # Lookups derived from the registry must be dropped along with it
+    from app.models.layer_mapping import get_default_cam_layers
+    get_default_cam_layers.cache_clear()
+
     logger.debug("Registry cache cleared")
 
@@ -1,2 +0,0 @@
-"""Model registry package."""
-
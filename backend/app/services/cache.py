@@ -1,18 +1,30 @@
 """Image hash caching service with LRU eviction."""
 
-import hashlib
 import logging
+import threading
 from collections import OrderedDict
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.hashing import new_hasher
 from app.jobs.models import JobResult
 
 logger = logging.getLogger("app.services.cache")
 
 
+@lru_cache(maxsize=256)
+def _params_blob(model_id: str, top_k: int, sorted_layers: Tuple[str, ...]) -> bytes:
+    """
+    Encode the non-image part of a cache key once per unique parameter set.
+
+    Fields are NUL-separated so different parameter sets can't encode to the same bytes.
+    """
+    return "\0".join((model_id, str(top_k), *sorted_layers)).encode("utf-8")
+
+
 class CacheService:
-    """Service for caching job results with LRU eviction."""
+    """Service for caching job results with LRU eviction (thread-safe)."""
 
     def __init__(self, max_items: int = 100):
         """
@@ -23,47 +35,56 @@ class CacheService:
         """
         self._cache: OrderedDict[str, JobResult] = OrderedDict()
         self._max_items = max_items
+        self._lock = threading.RLock()
 
-    def compute_cache_key(self, image_bytes: bytes, model_id: str, top_k: int = 3, cam_layers: Optional[List[str]] = None) -> str:
+    def compute_cache_key(self, image_hash: str, model_id: str, top_k: int = 3, cam_layers: Optional[List[str]] = None) -> str:
         """
-        Compute SHA256 hash of image bytes + model_id + top_k + cam_layers.
+        Compute BLAKE3 hash of the image hash + model_id + top_k + cam_layers.
+
+        Falls back to BLAKE2b (32-byte digest) when the blake3 package is not installed.
+        The image itself is only hashed once per upload (see compute_image_hash), so
+        this only hashes a few dozen bytes.
 
         Args:
-            image_bytes: Raw image bytes
+            image_hash: Content hash of the image bytes (from compute_image_hash)
             model_id: Model identifier
             top_k: Number of top classes (default: 3)
             cam_layers: List of layer names for Grad-CAM (default: None, uses default layers)
 
         Returns:
-            Hex digest of cache key (SHA256 of image_bytes + model_id + top_k + sorted cam_layers)
+            Hex digest of cache key (hash of image hash + model_id + top_k + sorted cam_layers)
         """
         # Default cam_layers if None
         if cam_layers is None:
             cam_layers = ["conv1", "layer1", "layer2", "layer3", "layer4"]
 
         # Sort layers for consistent cache key
-        sorted_layers = sorted(cam_layers)
-        layers_str = ",".join(sorted_layers)
+        sorted_layers = tuple(sorted(cam_layers))
 
-        # Combine image_bytes + model_id + top_k + layers (encoded to bytes)
-        combined = image_bytes + model_id.encode('utf-8') + str(top_k).encode('utf-8') + layers_str.encode('utf-8')
-        return hashlib.sha256(combined).hexdigest()
+        # Hash the image hash, then the small pre-encoded parameter blob
+        hasher = new_hasher()
+        hasher.update(bytes.fromhex(image_hash))
+        hasher.update(_params_blob(model_id, top_k, sorted_layers))
+        return hasher.hexdigest()
 
     def get(self, cache_key: str) -> Optional[JobResult]:
         """
         Get cached result by cache key (LRU: moves item to end).
 
         Args:
-            cache_key: SHA256 hash of image_bytes + model_id
+            cache_key: Hash of image_bytes + model_id
 
         Returns:
             Cached JobResult if found, None otherwise
         """
-        if cache_key in self._cache:
-            # Move to end (most recently used)
-            self._cache.move_to_end(cache_key)
+        with self._lock:
+            value = self._cache.get(cache_key)
+            if value is not None:
+                # Move to end (most recently used)
+                self._cache.move_to_end(cache_key)
+        if value is not None:
             logger.debug(f"Cache hit for key: {cache_key[:16]}...")
-            return self._cache[cache_key]
+            return value
 
         logger.debug(f"Cache miss for key: {cache_key[:16]}...")
         return None
@@ -73,24 +94,23 @@ class CacheService:
         Store result in cache (LRU: adds/moves to end, evicts oldest if over limit).
 
         Args:
-            cache_key: SHA256 hash of image_bytes + model_id
+            cache_key: Hash of image_bytes + model_id
             value: JobResult to cache
         """
-        if cache_key in self._cache:
-            # Update existing entry and move to end
-            self._cache.move_to_end(cache_key)
-        else:
-            # Add new entry
-            self._cache[cache_key] = value
-
-            # Evict oldest if over limit
-            if len(self._cache) > self._max_items:
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
-                logger.debug(f"Evicted cache entry: {oldest_key[:16]}...")
-
-        # Ensure it's at the end (most recently used)
-        self._cache.move_to_end(cache_key)
+        with self._lock:
+            if cache_key in self._cache:
+                # Update existing entry and move to end
+                self._cache[cache_key] = value
+                self._cache.move_to_end(cache_key)
+            else:
+                # Add new entry (inserted at the end, most recently used)
+                self._cache[cache_key] = value
+
+                # Evict oldest if over limit
+                if len(self._cache) > self._max_items:
+                    oldest_key, _ = self._cache.popitem(last=False)
+                    logger.debug(f"Evicted cache entry: {oldest_key[:16]}...")
+
         logger.debug(f"Cached result for key: {cache_key[:16]}... (cache size: {len(self._cache)}/{self._max_items})")
 
     def has(self, cache_key: str) -> bool:
@@ -98,16 +118,18 @@ class CacheService:
         Check if cache contains entry for cache key.
 
         Args:
-            cache_key: SHA256 hash of image_bytes + model_id
+            cache_key: Hash of image_bytes + model_id
 
         Returns:
             True if cached, False otherwise
         """
-        return cache_key in self._cache
+        with self._lock:
+            return cache_key in self._cache
 
     def clear(self) -> None:
         """Clear all cached entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.debug("Cache cleared")
 
     def size(self) -> int:
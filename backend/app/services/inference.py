@@ -1,94 +1,331 @@
-"""PyTorch inference service."""
+"""Batched prediction forward passes."""
 
-from typing import Any, Dict
+import asyncio
+import itertools
+import logging
+import weakref
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import torch
+import torch.nn.functional as F
+
+from app.core.config import settings
+from app.models.loaders import get_inference_model
+
+logger = logging.getLogger("app.services.inference")
+
+# (model_id, input tensor [1, C, H, W], top_k, future resolved with top-k (probabilities, indices))
+_Request = Tuple[str, torch.Tensor, int, asyncio.Future]
+
+# (model weakref, graph, static input, static output probabilities) of a captured forward pass
+_GraphEntry = Tuple[weakref.ref, "torch.cuda.CUDAGraph", torch.Tensor, torch.Tensor]
+
+# (pinned host buffer, event recorded after its last H2D copy)
+_PinnedSlot = Tuple[torch.Tensor, "torch.cuda.Event"]
+
+# settings.AUTOCAST_DTYPE -> torch dtype (None = full FP32)
+_AUTOCAST_DTYPES = {"none": None, "float16": torch.float16, "bfloat16": torch.bfloat16}
 
 
 class InferenceService:
-    """Service for running PyTorch model inference."""
+    """
+    Service for running prediction forward passes.
+
+    While started, requests from concurrent jobs are queued and coalesced into
+    one batched forward pass per model, so N jobs cost one kernel launch sequence
+    instead of N. Without a running batcher (e.g. scripts, tests) each request
+    runs its own forward pass directly.
+    """
 
     def __init__(self):
         """Initialize inference service."""
-        self._models: Dict[str, torch.nn.Module] = {}
-        self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        if settings.DEVICE.startswith("cuda"):
+            # Input shapes are fixed per model, so let cuDNN autotune conv algorithms once
+            # per shape, and allow TF32 tensor cores for matmuls
+            torch.backends.cudnn.benchmark = True
+            torch.set_float32_matmul_precision("high")
+
+        self._autocast_dtype: Optional[torch.dtype] = _AUTOCAST_DTYPES[settings.AUTOCAST_DTYPE]
+        # CUDA (copy, compute) streams, created on first use so importing doesn't initialize CUDA
+        self._streams: Optional[Tuple["torch.cuda.Stream", "torch.cuda.Stream"]] = None
+        # Rings of PINNED_RING_SIZE pinned staging buffers (with the event of their last
+        # H2D copy) per input (shape, dtype), allocated on first use
+        self._pinned_rings: Dict[Tuple[Tuple[int, ...], torch.dtype], Iterator[_PinnedSlot]] = {}
+        # Captured CUDA graphs keyed by (model_id, input shape), used when CUDA_GRAPHS is set
+        self._graphs: Dict[Tuple[str, Tuple[int, ...]], _GraphEntry] = {}
+        self._queue: Optional[asyncio.Queue[_Request]] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background batcher."""
+        if self._batcher_task is None or self._batcher_task.done():
+            self._queue = asyncio.Queue()
+            self._batcher_task = asyncio.create_task(self._batch_loop())
+            logger.info("Inference batcher started")
+
+    async def stop(self) -> None:
+        """Stop the background batcher, failing any requests still queued."""
+        task, self._batcher_task = self._batcher_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        while self._queue is not None and not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference service stopped"))
+        logger.info("Inference batcher stopped")
+
+    def _get_streams(self) -> Tuple["torch.cuda.Stream", "torch.cuda.Stream"]:
+        """Get the (copy, compute) CUDA streams, creating them on first use."""
+        if self._streams is None:
+            device = torch.device(settings.DEVICE)
+            self._streams = (torch.cuda.Stream(device), torch.cuda.Stream(device))
+        return self._streams
 
-    async def load_model(self, model_id: str) -> torch.nn.Module:
+    def _next_pinned_slot(self, image_tensor: torch.Tensor) -> _PinnedSlot:
         """
-        Load model from registry.
+        Lease the next pinned staging buffer for inputs shaped like image_tensor.
+
+        Buffers are reused round robin, so steady-state uploads never allocate or
+        pin host memory. Before a buffer is handed out again, this waits for the
+        H2D copy that last read from it (normally finished long ago).
+        """
+        key = (tuple(image_tensor.shape), image_tensor.dtype)
+        ring = self._pinned_rings.get(key)
+        if ring is None:
+            slots = [
+                # empty_like keeps the channels_last layout, so the fill is a straight copy
+                (torch.empty_like(image_tensor, device="cpu", pin_memory=True), torch.cuda.Event())
+                for _ in range(settings.PINNED_RING_SIZE)
+            ]
+            ring = self._pinned_rings[key] = itertools.cycle(slots)
+
+        slot, copied = next(ring)
+        copied.synchronize()
+        return slot, copied
+
+    def to_device(self, image_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Copy a preprocessed input tensor to settings.DEVICE.
+
+        On CUDA the input is staged in a preallocated pinned buffer (see
+        PINNED_RING_SIZE) and copied on a dedicated copy stream, so it overlaps
+        with forward passes of other jobs on the compute stream. The current
+        stream waits for the copy, so the result can be used right away.
 
         Args:
-            model_id: Model identifier from registry
+            image_tensor: Preprocessed image tensor on the CPU
 
         Returns:
-            Loaded PyTorch model
+            The tensor on settings.DEVICE
         """
-        # TODO: Load model config from registry
-        # TODO: Load model weights
-        # TODO: Set model to eval mode
-        # TODO: Cache loaded models
+        if not settings.DEVICE.startswith("cuda"):
+            return image_tensor.to(settings.DEVICE)
 
-        if model_id not in self._models:
-            # Placeholder: create dummy model
-            self._models[model_id] = torch.nn.Sequential(
-                torch.nn.Conv2d(3, 64, 3),
-                torch.nn.ReLU(),
-            ).to(self._device)
-            self._models[model_id].eval()
-
-        return self._models[model_id]
+        copy_stream, _ = self._get_streams()
+        slot, copied = self._next_pinned_slot(image_tensor)
+        slot.copy_(image_tensor)
+        with torch.cuda.stream(copy_stream):
+            device_tensor = slot.to(settings.DEVICE, non_blocking=True)
+            copied.record(copy_stream)
+        current_stream = torch.cuda.current_stream()
+        current_stream.wait_stream(copy_stream)
+        # Allocated on the copy stream but used on others: keep the allocator from reusing it early
+        device_tensor.record_stream(current_stream)
+        return device_tensor
 
     async def run_inference(
         self,
         model_id: str,
         image_tensor: torch.Tensor,
-    ) -> Dict[str, Any]:
+        top_k: int,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
-        Run inference on image tensor.
+        Run the prediction forward pass for one image.
+
+        Only the top-K classes are returned; the full probability vector never
+        leaves the forward pass.
 
         Args:
             model_id: Model identifier
-            image_tensor: Preprocessed image tensor
+            image_tensor: Preprocessed image tensor [1, C, H, W] on the inference device
+            top_k: Number of top classes to return (capped at the number of classes)
 
         Returns:
-            Dictionary with inference results including:
-            - feature_maps: Intermediate layer activations
-            - predictions: Final predictions
-            - layer_names: List of layer names
+            Tuple of (probabilities [K], class indices [K]), sorted by descending
+            probability and left on the inference device
         """
-        # TODO: Load model if not cached
-        # TODO: Preprocess image tensor
-        # TODO: Run forward pass and capture intermediate activations
-        # TODO: Extract feature maps for each layer
-        # TODO: Return structured results
+        if self._batcher_task is None or self._batcher_task.done():
+            top_probs, top_indices = self._forward(model_id, [image_tensor], top_k)
+            return top_probs[0], top_indices[0]
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_id, image_tensor, top_k, future))
+        return await future
+
+    async def _batch_loop(self) -> None:
+        """Collect queued requests for up to INFERENCE_BATCH_WINDOW_MS and run them as batches."""
+        while True:
+            batch = [await self._queue.get()]
+
+            # Give other workers a chance to submit before the batch is cut
+            if settings.INFERENCE_BATCH_WINDOW_MS > 0:
+                await asyncio.sleep(settings.INFERENCE_BATCH_WINDOW_MS / 1000)
+            while len(batch) < settings.INFERENCE_MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self._run_batch(batch)
 
-        model = await self.load_model(model_id)
+    def _run_batch(self, batch: List[_Request]) -> None:
+        """Run one forward pass per model in the batch and resolve each request's future."""
+        by_model: Dict[str, List[_Request]] = {}
+        for request in batch:
+            # Skip requests whose job was cancelled while waiting
+            if not request[3].done():
+                by_model.setdefault(request[0], []).append(request)
 
-        with torch.no_grad():
-            # Placeholder inference
-            output = model(image_tensor.to(self._device))
+        for model_id, requests in by_model.items():
+            # One topk over the batch with the largest K, sliced per request
+            top_k = max(k for _, _, k, _ in requests)
+            try:
+                top_probs, top_indices = self._forward(
+                    model_id, [tensor for _, tensor, _, _ in requests], top_k
+                )
+            except Exception as e:
+                for _, _, _, future in requests:
+                    future.set_exception(e)
+                continue
 
-        return {
-            "feature_maps": {},
-            "predictions": output.cpu().numpy().tolist() if isinstance(output, torch.Tensor) else [],
-            "layer_names": [],
-        }
+            if len(requests) > 1:
+                logger.debug("Batched %d requests for %s", len(requests), model_id)
+            for i, (_, _, k, future) in enumerate(requests):
+                future.set_result((top_probs[i, :k], top_indices[i, :k]))
 
-    def get_model_info(self, model_id: str) -> Dict[str, Any]:
+    def _forward(
+        self,
+        model_id: str,
+        tensors: List[torch.Tensor],
+        top_k: int,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
-        Get model information from registry.
+        Forward a list of [1, C, H, W] inputs as one batch.
 
-        Args:
-            model_id: Model identifier
+        Returns top-K (probabilities, indices), each [N, K].
+
+        On CUDA the forward runs on the compute stream, ordered only after the input
+        copies (not after unrelated work queued on the current stream, such as another
+        job's Grad-CAM), and the current stream waits for it before using the result.
+        """
+        if not settings.DEVICE.startswith("cuda"):
+            return self._predict(model_id, tensors, top_k)
+
+        copy_stream, compute_stream = self._get_streams()
+        current_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(copy_stream)
+        with torch.cuda.stream(compute_stream):
+            top_probs, top_indices = self._predict(model_id, tensors, top_k)
+        for tensor in tensors:
+            tensor.record_stream(compute_stream)
+        current_stream.wait_stream(compute_stream)
+        top_probs.record_stream(current_stream)
+        top_indices.record_stream(current_stream)
+        return top_probs, top_indices
+
+    def _predict(
+        self,
+        model_id: str,
+        tensors: List[torch.Tensor],
+        top_k: int,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Run the model on the batched inputs and return top-K (probabilities, indices) [N, K]."""
+        batch = tensors[0] if len(tensors) == 1 else torch.cat(tensors, dim=0)
+        model = get_inference_model(model_id)
+        on_cuda = settings.DEVICE.startswith("cuda")
+        if settings.CUDA_GRAPHS and on_cuda and not settings.COMPILE_MODELS:
+            probs = self._replay_graph(model_id, model, batch)
+        else:
+            probs = self._probabilities(model, batch)
+        with torch.inference_mode():
+            return torch.topk(probs, k=min(top_k, probs.shape[1]), dim=1)
+
+    def _probabilities(
+        self,
+        model: Callable[[torch.Tensor], torch.Tensor],
+        batch: torch.Tensor,
+    ) -> torch.Tensor:
+        """Forward a batch and return class probabilities [N, num_classes]."""
+        # Predictions never need gradients; inference_mode also skips view/version tracking.
+        # Weights stay FP32, autocast only lowers the precision of eligible ops (its cast
+        # cache only lives for one forward anyway, and must be off for CUDA graph capture)
+        with torch.inference_mode(), torch.autocast(
+            device_type=batch.device.type,
+            dtype=self._autocast_dtype,
+            enabled=self._autocast_dtype is not None,
+            cache_enabled=False,
+        ):
+            output = model(batch)
+        with torch.inference_mode():
+            return F.softmax(output.float(), dim=1)
+
+    def _replay_graph(
+        self,
+        model_id: str,
+        model: Callable[[torch.Tensor], torch.Tensor],
+        batch: torch.Tensor,
+    ) -> torch.Tensor:
+        """
+        Run the forward pass by replaying a captured CUDA graph.
+
+        One graph is captured per (model_id, input shape) on first use, so each
+        batch size seen costs one capture. Graphs bake in the weights' device
+        addresses: an entry whose model has been evicted (dead weakref) or
+        replaced is recaptured, and entries of evicted models are dropped.
 
         Returns:
-            Model configuration dictionary
+            Probabilities [N, num_classes] in the graph's static output buffer,
+            valid until the next replay of the same graph
         """
-        # TODO: Load and parse model registry YAML
-        # TODO: Return model config for given model_id
-        return {}
+        key = (model_id, tuple(batch.shape))
+        entry = self._graphs.get(key)
+        if entry is None or entry[0]() is not model:
+            self._graphs = {k: v for k, v in self._graphs.items() if v[0]() is not None}
+            entry = self._capture_graph(model, batch)
+            self._graphs[key] = entry
+            logger.info("Captured CUDA graph for %s (batch %d)", model_id, batch.shape[0])
+
+        _, graph, static_input, static_probs = entry
+        static_input.copy_(batch)
+        graph.replay()
+        return static_probs
+
+    def _capture_graph(
+        self,
+        model: Callable[[torch.Tensor], torch.Tensor],
+        batch: torch.Tensor,
+    ) -> _GraphEntry:
+        """Capture the forward pass for batch's shape into a CUDA graph."""
+        static_input = torch.empty_like(batch)
+        static_input.copy_(batch)
+
+        # Warm up on a side stream first (cuDNN autotuning, lazy allocations),
+        # as required before capture
+        side_stream = torch.cuda.Stream(batch.device)
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(3):
+                self._probabilities(model, static_input)
+        torch.cuda.current_stream().wait_stream(side_stream)
+
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_probs = self._probabilities(model, static_input)
+        return weakref.ref(model), graph, static_input, static_probs
 
 
 # Global inference service instance
 inference_service = InferenceService()
-
@@ -1,12 +1,29 @@
 """Storage service for saving generated visual assets."""
 
-import json
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import aiofiles
+import orjson
 
 from app.core.config import settings
 
+# One blocking write per file on a pool shared by all StorageService instances; aiofiles
+# needs a separate executor round-trip for each open/write/close
+_storage_pool = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="storage"
+)
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    path.write_bytes(data)
+
+
+def _write_json(path: Path, data: dict) -> None:
+    # NumPy scalars/arrays (e.g., Grad-CAM probs and class ids) serialize without .item()/.tolist()
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
 
 class StorageService:
     """Service for managing storage of generated assets."""
@@ -50,8 +67,8 @@ class StorageService:
         job_path = self.get_job_storage_path(job_id)
         file_path = job_path / filename
 
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(content)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_storage_pool, _write_bytes, file_path, content)
 
         return file_path
 
@@ -75,8 +92,9 @@ class StorageService:
         job_path = self.get_job_storage_path(job_id)
         file_path = job_path / filename
 
-        async with aiofiles.open(file_path, "w") as f:
-            await f.write(json.dumps(data, indent=2))
+        # Serialized on the storage pool too, so large manifests don't block the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_storage_pool, _write_json, file_path, data)
 
         return file_path
 
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Bake model_registry.yaml into a Python module.
+
+Writes app/models/_baked_registry.py containing the parsed registry as a Python
+literal plus the SHA-256 of the YAML it was generated from. The registry loader
+imports it instead of parsing YAML, as long as the hash still matches the
+configured registry file.
+
+Run after editing model_registry.yaml:
+    python scripts/bake_registry.py
+"""
+
+import hashlib
+import pprint
+import sys
+from pathlib import Path
+
+import yaml
+
+backend_dir = Path(__file__).parent.parent
+REGISTRY_PATH = backend_dir / "model_registry.yaml"
+OUTPUT_PATH = backend_dir / "app" / "models" / "_baked_registry.py"
+
+HEADER = '''"""
+Pre-parsed model registry.
+
+Generated by scripts/bake_registry.py from model_registry.yaml - do not edit.
+"""
+
+'''
+
+
+def main() -> int:
+    raw = REGISTRY_PATH.read_bytes()
+    data = yaml.safe_load(raw)
+    if not data or "models" not in data:
+        print(f"Invalid registry format in {REGISTRY_PATH}: missing 'models' key")
+        return 1
+
+    source = (
+        HEADER
+        + f'SOURCE_SHA256 = "{hashlib.sha256(raw).hexdigest()}"\n\n'
+        + f"MODELS = {pprint.pformat(data, sort_dicts=False)}\n"
+    )
+    OUTPUT_PATH.write_text(source)
+    print(f"Baked {len(data['models'])} models into {OUTPUT_PATH.relative_to(backend_dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
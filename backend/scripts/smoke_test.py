@@ -4,6 +4,7 @@ Smoke test script for CNN Lens backend.
 Tests end-to-end flow: health check, model listing, job creation, and result verification.
 """
 
+import json
 import sys
 import time
 import requests
@@ -81,6 +82,36 @@ def test_poll_job(job_id: str, max_wait_seconds: int = 120):
     
     raise TimeoutError(f"Job did not complete within {max_wait_seconds} seconds")
 
+def test_stream_job(job_id: str, max_wait_seconds: int = 120):
+    """Follow job status over Server-Sent Events until SUCCEEDED or FAILED."""
+    print(f"Streaming job {job_id} events (max {max_wait_seconds}s)...")
+    
+    # Read timeout applies between events; the job keeps sending progress updates
+    with requests.get(f"{API_BASE}/jobs/{job_id}/events", stream=True, timeout=(10, max_wait_seconds)) as response:
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+        
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            status = event.get("status")
+            
+            print(f"  Status: {status}, Progress: {event.get('progress', 0)}%, Message: {event.get('message', '')}")
+            
+            if status == "succeeded":
+                print("✓ Job succeeded")
+                break
+            elif status == "failed":
+                error_msg = event.get("message", "Unknown error")
+                raise AssertionError(f"Job failed: {error_msg}")
+        else:
+            raise AssertionError("Event stream closed before the job finished")
+    
+    # Events carry status only; fetch the full result
+    response = requests.get(f"{API_BASE}/jobs/{job_id}", timeout=10)
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    return response.json()
+
 def test_verify_results(job_data: dict):
     """Verify job results meet requirements."""
     print("Verifying job results...")
@@ -163,8 +194,8 @@ def main():
             )
         job_id = test_create_job(model_id, sample_image_path)
         
-        # Test 4: Poll job
-        job_data = test_poll_job(job_id)
+        # Test 4: Follow job progress (SSE; test_poll_job is the polling equivalent)
+        job_data = test_stream_job(job_id)
         
         # Test 5: Verify results
         test_verify_results(job_data)
@@ -1,16 +1,21 @@
 """Shared pytest fixtures for backend tests."""
 
-import os
 import tempfile
 import io
+import warnings
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 
+import httpx
 import pytest
+import pytest_asyncio
+import torch
 from PIL import Image
-from fastapi.testclient import TestClient
 
+from app.jobs.service import job_service
 from app.main import app
+from app.models.loaders import load_model, warmup_model
+from app.services.cache import cache_service
 
 
 @pytest.fixture(scope="session")
@@ -20,31 +25,77 @@ def tmp_storage_dir() -> Generator[Path, None, None]:
         yield Path(tmpdir)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image() -> Image.Image:
-    """Create a small test image (224x224 RGB)."""
+    """Create a small test image (224x224 RGB), shared by all tests (don't modify it)."""
     return Image.new("RGB", (224, 224), color=(128, 128, 128))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_image_bytes(sample_image: Image.Image) -> bytes:
-    """Convert sample image to bytes (PNG format)."""
+    """Convert sample image to bytes (PNG format), encoded once per session."""
     buffer = io.BytesIO()
     sample_image.save(buffer, format="PNG")
     buffer.seek(0)
     return buffer.getvalue()
 
 
-@pytest.fixture
-def client() -> Generator[TestClient, None, None]:
-    """Create a FastAPI test client."""
-    # Reset the module-level job_service singleton so each test gets a fresh
-    # asyncio.Queue/Lock/worker_task. Without this, the queue from a prior
-    # test's closed event loop leaves waiters parked forever and the next
-    # TestClient's startup hangs indefinitely.
-    from app.jobs.service import job_service
+@pytest.fixture(scope="session", autouse=True)
+def warm_resnet18() -> Optional[torch.nn.Module]:
+    """
+    Load ResNet-18 into the model cache and warm its serving path once, before any test runs.
+
+    warmup_model() runs the same dummy forward as server startup, so the first
+    job a test submits doesn't pay for backend initialization (or for
+    compilation/export when COMPILE_MODELS or EXPORT_MODELS is set).
+
+    Only a failed weight download is tolerated (with a warning), so offline runs
+    still execute the tests that don't need the model; any other error in the
+    load/warmup path fails the session.
+
+    Returns:
+        The warmed cached model, or None if its weights couldn't be downloaded
+    """
+    try:
+        warmup_model("resnet18")
+    except OSError as e:  # includes urllib's URLError
+        warnings.warn(f"Could not warm up resnet18 (weights unavailable?): {e}")
+        return None
+    return load_model("resnet18")
+
+
+@pytest.fixture(scope="session")
+def resnet18_model(warm_resnet18: Optional[torch.nn.Module]) -> torch.nn.Module:
+    """ResNet-18 warmed by warm_resnet18 (shared by all tests, in eval mode)."""
+    if warm_resnet18 is None:
+        # Warm-up couldn't download the weights: retry so the test fails with the real error
+        return load_model("resnet18")
+    return warm_resnet18
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    """
+    Create an async API client, shared by all tests (app startup/shutdown runs once).
+
+    Requests go straight to the ASGI app on the session event loop (no thread or
+    loop per request). The app's startup/shutdown handlers run on that same loop,
+    so the job workers share it with the requests that enqueue jobs. Tests using
+    it must run on the session loop: pytest.mark.asyncio(loop_scope="session").
+    """
+    # Reset the module-level job_service singleton so its asyncio.Queue/Lock are
+    # created fresh for the session loop (not one from an earlier import).
     job_service.__init__()
 
-    with TestClient(app) as test_client:
-        yield test_client
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest_asyncio.fixture(autouse=True, loop_scope="session")
+async def reset_job_state() -> None:
+    """Clear jobs and cached results so tests sharing the client don't see each other's jobs."""
+    await job_service.reset_state()
+    cache_service.clear()
 
@@ -1,26 +1,21 @@
 """Unit tests for feature maps visualization."""
 
 import tempfile
-import shutil
 from pathlib import Path
 
-import pytest
 import torch
 
 from app.inspect.feature_maps import save_feature_maps
 from app.inspect.hooks import capture_activations
-from app.models.loaders import load_model
 
 
-def test_save_feature_maps_one_layer():
+def test_save_feature_maps_one_layer(resnet18_model):
     """Test that feature maps can be saved for one layer."""
     # Create temporary directory for testing
     with tempfile.TemporaryDirectory() as temp_dir:
         storage_dir = Path(temp_dir)
         
-        # Load resnet18 model
-        model = load_model("resnet18")
-        model.eval()
+        model = resnet18_model
         
         # Create dummy input tensor [1, 3, 224, 224]
         dummy_input = torch.randn(1, 3, 224, 224)
@@ -62,6 +57,7 @@ def test_save_feature_maps_one_layer():
         for entry in manifest:
             assert "channel_index" in entry, "Manifest entry should have 'channel_index'"
             assert "mean" in entry, "Manifest entry should have 'mean'"
+            assert "min" in entry, "Manifest entry should have 'min'"
             assert "max" in entry, "Manifest entry should have 'max'"
             assert "file_path" in entry, "Manifest entry should have 'file_path'"
             
@@ -78,7 +74,9 @@ def test_save_feature_maps_one_layer():
             # Verify stats are numeric
             assert isinstance(entry["channel_index"], int)
             assert isinstance(entry["mean"], float)
+            assert isinstance(entry["min"], float)
             assert isinstance(entry["max"], float)
+            assert entry["min"] <= entry["mean"] <= entry["max"]
         
         # Verify file paths are relative
         for entry in manifest:
@@ -88,10 +86,3 @@ def test_save_feature_maps_one_layer():
             assert file_path_str.endswith(".png"), f"File path should end with .png: {file_path_str}"
         
         print(f"✓ Successfully saved {len(manifest)} feature maps for layer '{layer_name}'")
-
-
-if __name__ == "__main__":
-    print("Running feature maps test...")
-    test_save_feature_maps_one_layer()
-    print("✓ Feature maps test passed!")
-
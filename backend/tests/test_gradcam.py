@@ -1,7 +1,6 @@
 """Unit tests for Grad-CAM visualization."""
 
 import tempfile
-import io
 from pathlib import Path
 
 import pytest
@@ -9,32 +8,15 @@ import torch
 from PIL import Image
 
 from app.inspect.gradcam import generate_gradcam_topk
-from app.models.loaders import load_model, preprocess_image
+from app.models.loaders import preprocess_image
 
 
-def create_test_image_bytes(width: int = 224, height: int = 224) -> bytes:
-    """Create a simple test image as bytes."""
-    image = Image.new("RGB", (width, height), color=(128, 128, 128))
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer.getvalue()
-
-
-def test_gradcam_output_files_exist():
+def test_gradcam_output_files_exist(resnet18_model, sample_image, sample_image_bytes):
     """Test that generate_gradcam_topk produces output files."""
-    model = load_model("resnet18")
-    model.eval()
-    
-    # Create sample image
-    sample_image = Image.new("RGB", (224, 224), color=(128, 128, 128))
-    
-    # Preprocess the image - preprocess_image expects bytes
-    # Convert to bytes first, then preprocess
-    buffer = io.BytesIO()
-    sample_image.save(buffer, format="PNG")
-    image_bytes = buffer.getvalue()
-    input_tensor = preprocess_image(image_bytes, "resnet18")
+    model = resnet18_model
+
+    # Preprocess the image from its encoded bytes
+    input_tensor = preprocess_image(sample_image_bytes, "resnet18")
     
     # Create temporary directory for output
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -81,17 +63,10 @@ def test_gradcam_output_files_exist():
                 pytest.fail(f"Failed to open overlay image {overlay_path}: {e}")
 
 
-def test_gradcam_output_directory_structure():
+def test_gradcam_output_directory_structure(resnet18_model, sample_image, sample_image_bytes):
     """Test that Grad-CAM outputs are saved in correct directory structure."""
-    model = load_model("resnet18")
-    model.eval()
-    
-    # Create sample image
-    sample_image = Image.new("RGB", (224, 224), color=(128, 128, 128))
-    buffer = io.BytesIO()
-    sample_image.save(buffer, format="PNG")
-    image_bytes = buffer.getvalue()
-    input_tensor = preprocess_image(image_bytes, "resnet18")
+    model = resnet18_model
+    input_tensor = preprocess_image(sample_image_bytes, "resnet18")
     
     with tempfile.TemporaryDirectory() as tmpdir:
         storage_dir = Path(tmpdir)
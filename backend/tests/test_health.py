@@ -1,12 +1,15 @@
 """Tests for health endpoint."""
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 
+# Share the session event loop with the async_client fixture
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-def test_health_endpoint(client: TestClient):
+
+async def test_health_endpoint(async_client: httpx.AsyncClient):
     """Test that health endpoint returns ok status."""
-    response = client.get("/api/v1/health")
+    response = await async_client.get("/api/v1/health")
     
     assert response.status_code == 200
     data = response.json()
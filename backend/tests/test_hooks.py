@@ -5,12 +5,11 @@ import torch
 import torch.nn as nn
 
 from app.inspect.hooks import capture_activations, get_layer_by_path
-from app.models.loaders import load_model
 
 
-def test_get_layer_by_path_resnet18():
+def test_get_layer_by_path_resnet18(resnet18_model):
     """Test getting layers by path for ResNet-18."""
-    model = load_model("resnet18")
+    model = resnet18_model
     
     # Test getting different layers
     layer1 = get_layer_by_path(model, "layer1")
@@ -23,10 +22,9 @@ def test_get_layer_by_path_resnet18():
     assert isinstance(conv1, nn.Module)
 
 
-def test_capture_activations_resnet18():
+def test_capture_activations_resnet18(resnet18_model):
     """Test capturing activations for ResNet-18 with at least 3 layers."""
-    model = load_model("resnet18")
-    model.eval()
+    model = resnet18_model
     
     # Create a dummy input tensor [1, 3, 224, 224]
     input_tensor = torch.randn(1, 3, 224, 224)
@@ -52,10 +50,9 @@ def test_capture_activations_resnet18():
             assert activation.shape[3] > 0, f"Width should be > 0, got {activation.shape[3]}"
 
 
-def test_capture_activations_shape_consistency():
+def test_capture_activations_shape_consistency(resnet18_model):
     """Test that captured activations have consistent batch dimension."""
-    model = load_model("resnet18")
-    model.eval()
+    model = resnet18_model
     
     input_tensor = torch.randn(1, 3, 224, 224)
     layer_paths = ["layer1", "layer2"]
@@ -0,0 +1,76 @@
+"""Unit tests for the batched inference service."""
+
+import asyncio
+from typing import List
+
+import pytest
+import torch
+
+from app.core.config import settings
+from app.services.inference import InferenceService
+
+
+@pytest.fixture
+def batching_settings(monkeypatch):
+    """Give concurrent requests a window to join one batch."""
+    monkeypatch.setattr(settings, "INFERENCE_BATCH_WINDOW_MS", 50)
+    monkeypatch.setattr(settings, "INFERENCE_MAX_BATCH", 8)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_inference_batches_concurrent_requests(resnet18_model, batching_settings):
+    """Test that concurrent requests share one forward pass but keep their own top-K."""
+    # Own instance: the global inference_service belongs to the app lifespan of the API tests
+    service = InferenceService()
+    torch.manual_seed(0)
+    inputs = [torch.randn(1, 3, 224, 224) for _ in range(4)]
+    top_ks = [1, 3, 5, 2]
+
+    batch_sizes: List[int] = []
+    forward = service._forward
+
+    def recording_forward(model_id, tensors, top_k):
+        batch_sizes.append(len(tensors))
+        return forward(model_id, tensors, top_k)
+
+    service._forward = recording_forward
+    await service.start()
+    try:
+        results = await asyncio.gather(*(
+            service.run_inference("resnet18", tensor, k) for tensor, k in zip(inputs, top_ks)
+        ))
+    finally:
+        await service.stop()
+
+    assert batch_sizes == [4], f"Expected one batch of 4 requests, got {batch_sizes}"
+
+    # Each result matches an unbatched forward pass of the same input
+    for tensor, k, (probs, indices) in zip(inputs, top_ks, results):
+        expected_probs, expected_indices = forward("resnet18", [tensor], k)
+        assert probs.shape == (k,) and indices.shape == (k,)
+        assert torch.equal(indices, expected_indices[0])
+        assert torch.allclose(probs, expected_probs[0], atol=1e-5)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_run_inference_batch_error_reaches_every_request(resnet18_model, batching_settings):
+    """Test that a failed batched forward pass fails every request in the batch."""
+    service = InferenceService()
+
+    def failing_forward(model_id, tensors, top_k):
+        raise RuntimeError("forward failed")
+
+    service._forward = failing_forward
+    await service.start()
+    try:
+        results = await asyncio.gather(
+            *(service.run_inference("resnet18", torch.zeros(1, 3, 224, 224), 3) for _ in range(3)),
+            return_exceptions=True,
+        )
+    finally:
+        await service.stop()
+
+    assert len(results) == 3
+    for result in results:
+        assert isinstance(result, RuntimeError)
+        assert str(result) == "forward failed"
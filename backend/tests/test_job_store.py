@@ -0,0 +1,181 @@
+"""Unit tests for job store backends."""
+
+import asyncio
+from typing import AsyncGenerator, Callable
+
+import pytest
+import pytest_asyncio
+
+from app.jobs.models import JobRecord, JobStatus
+from app.jobs.store import JobStore, MemoryJobStore, RedisJobStore
+
+# Reclaim threshold for the Redis tests, and how long they wait for it to pass
+CLAIM_IDLE_SECONDS = 0.05
+CLAIM_WAIT_SECONDS = 0.1
+
+
+def test_incomplete_job_store_fails_at_construction():
+    """Test that a backend missing interface methods can't be instantiated."""
+    class IncompleteStore(JobStore):
+        async def get_job(self, job_id):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
+
+
+def test_memory_job_store_implements_interface():
+    """Test that the in-memory backend implements every interface method."""
+    assert isinstance(MemoryJobStore(), JobStore)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_memory_job_store_clear():
+    """Test that clear() drops job records, inputs and queued job IDs."""
+    store = MemoryJobStore()
+    job = JobRecord(job_id="job-1", model_id="resnet18", status=JobStatus.QUEUED)
+    await store.add_job(job, image_path="/tmp/input.png", params=(3, ["layer4"], None, "hash"))
+    await store.enqueue(job.job_id)
+    
+    await store.clear()
+    
+    assert await store.get_job(job.job_id) is None
+    assert await store.get_job_input(job.job_id) == (None, None)
+    # Only the shutdown sentinel is left in the queue
+    await store.interrupt()
+    assert await store.dequeue() is None
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def redis_stores() -> AsyncGenerator[Callable[[str], RedisJobStore], None]:
+    """
+    Build RedisJobStores (one per simulated worker process) sharing a fakeredis server.
+
+    Skipped when fakeredis isn't installed.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    clients = []
+
+    def make_store(consumer: str) -> RedisJobStore:
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        clients.append(client)
+        store = RedisJobStore(
+            "redis://unused",
+            job_ttl=60,
+            claim_idle_seconds=CLAIM_IDLE_SECONDS,
+            max_deliveries=2,
+            client=client,
+        )
+        store._consumer = consumer
+        store.BLOCK_MS = 10
+        return store
+
+    yield make_store
+    for client in clients:
+        await client.aclose()
+
+
+async def _add_queued_job(store: RedisJobStore, job_id: str = "job-1") -> None:
+    job = JobRecord(job_id=job_id, model_id="resnet18", status=JobStatus.QUEUED)
+    await store.add_job(job, image_path="/tmp/input.png", params=(3, ["layer4"], None, "hash"))
+    await store.enqueue(job_id)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_roundtrip(redis_stores):
+    """Test job records and inputs round-trip through Redis and expire after job_ttl."""
+    store = redis_stores("worker-a")
+    await _add_queued_job(store)
+    
+    job = await store.get_job("job-1")
+    assert job.model_id == "resnet18" and job.status == JobStatus.QUEUED
+    assert await store.get_job_input("job-1") == ("/tmp/input.png", (3, ["layer4"], None, "hash"))
+    assert 0 < await store._redis.ttl("job:job-1") <= 60
+    
+    await store.update_job("job-1", status=JobStatus.RUNNING, progress=50)
+    await store.discard_job_input("job-1")
+    job = await store.get_job("job-1")
+    assert job.status == JobStatus.RUNNING and job.progress == 50
+    assert await store.get_job_input("job-1") == (None, None)
+    # Updates keep the TTL set at creation
+    assert await store._redis.ttl("job:job-1") > 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_task_done_trims_stream(redis_stores):
+    """Test that a processed job is acknowledged and removed from the stream."""
+    store = redis_stores("worker-a")
+    await _add_queued_job(store)
+    
+    assert await store.dequeue() == "job-1"
+    assert await store.dequeue() is None
+    await store.task_done("job-1")
+    
+    assert await store._redis.xlen(store.STREAM) == 0
+    assert (await store._redis.xpending(store.STREAM, store.GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_reclaims_abandoned_job(redis_stores):
+    """Test that a job taken by a worker that died before XACK is run by another worker."""
+    crashed = redis_stores("worker-a")
+    await _add_queued_job(crashed)
+    assert await crashed.dequeue() == "job-1"  # never acknowledged
+    
+    await asyncio.sleep(CLAIM_WAIT_SECONDS)
+    restarted = redis_stores("worker-b")
+    assert await restarted.dequeue() == "job-1"
+    await restarted.task_done("job-1")
+    
+    assert await restarted._redis.xlen(restarted.STREAM) == 0
+    assert (await restarted._redis.xpending(restarted.STREAM, restarted.GROUP))["pending"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_fails_job_after_max_deliveries(redis_stores):
+    """Test that a job that keeps getting abandoned is marked FAILED instead of retried forever."""
+    await _add_queued_job(redis_stores("setup"))
+    
+    # Delivered twice (max_deliveries=2), abandoned both times
+    assert await redis_stores("worker-a").dequeue() == "job-1"
+    await asyncio.sleep(CLAIM_WAIT_SECONDS)
+    assert await redis_stores("worker-b").dequeue() == "job-1"
+    
+    await asyncio.sleep(CLAIM_WAIT_SECONDS)
+    store = redis_stores("worker-c")
+    assert await store.dequeue() is None
+    
+    job = await store.get_job("job-1")
+    assert job.status == JobStatus.FAILED
+    assert await store.get_job_input("job-1") == (None, None)
+    assert await store._redis.xlen(store.STREAM) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_acks_finished_abandoned_job(redis_stores):
+    """Test that a job that finished but wasn't acknowledged is dropped, not run again."""
+    crashed = redis_stores("worker-a")
+    await _add_queued_job(crashed)
+    assert await crashed.dequeue() == "job-1"
+    await crashed.update_job("job-1", status=JobStatus.SUCCEEDED)
+    
+    await asyncio.sleep(CLAIM_WAIT_SECONDS)
+    store = redis_stores("worker-b")
+    assert await store.dequeue() is None
+    assert (await store.get_job("job-1")).status == JobStatus.SUCCEEDED
+    assert await store._redis.xlen(store.STREAM) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_redis_job_store_clear(redis_stores):
+    """Test that clear() drops job hashes and the queue, and the queue works afterwards."""
+    store = redis_stores("worker-a")
+    await _add_queued_job(store)
+    
+    await store.clear()
+    
+    assert await store.get_job("job-1") is None
+    assert await store.dequeue() is None
+    await _add_queued_job(store, "job-2")
+    assert await store.dequeue() == "job-2"
@@ -1,65 +1,155 @@
 """Tests for job creation validation."""
 
 import io
+import json
+from typing import Optional
+
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
 
+from app.api.v1.routes import validate_image_upload
 
-def test_create_job_non_image_file(client: TestClient):
-    """Test that non-image files are rejected."""
-    # Create a text file (non-image)
-    text_file = io.BytesIO(b"This is not an image file")
-    text_file.name = "test.txt"
-    
-    response = client.post(
+# Valid 1x1 RGB PNG for requests that are rejected before the image is decoded
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+    "0000000c4944415478da63686868000003040181752e01bc0000000049454e44ae426082"
+)
+
+
+async def post_job(
+    client: httpx.AsyncClient,
+    image_bytes: bytes,
+    model_id: Optional[str] = "resnet18",
+    content_type: str = "image/png",
+    **options: str,
+) -> httpx.Response:
+    """POST /api/v1/jobs with one uploaded file and form fields (model_id=None omits it)."""
+    data = dict(options)
+    if model_id is not None:
+        data["model_id"] = model_id
+    return await client.post(
         "/api/v1/jobs",
-        data={"model_id": "resnet18"},
-        files={"image": ("test.txt", text_file, "text/plain")}
+        data=data,
+        files={"image": ("test.png", image_bytes, content_type)}
     )
-    
-    assert response.status_code == 400
-    data = response.json()
-    assert "detail" in data
-    assert "image" in data["detail"].lower()
 
 
-def test_create_job_missing_model_id(client: TestClient, sample_image_bytes: bytes):
-    """Test that missing model_id is rejected."""
-    response = client.post(
-        "/api/v1/jobs",
-        files={"image": ("test.png", io.BytesIO(sample_image_bytes), "image/png")}
+def test_validate_image_upload_rejects_non_image():
+    """Test that non-image uploads are rejected before the file is read."""
+    upload = UploadFile(
+        io.BytesIO(b"This is not an image file"),
+        filename="test.txt",
+        headers=Headers({"content-type": "text/plain"}),
     )
     
-    # FastAPI should return 422 for missing form field
-    assert response.status_code == 422
+    with pytest.raises(HTTPException) as exc_info:
+        validate_image_upload(upload)
+    
+    assert exc_info.value.status_code == 400
+    assert "image" in exc_info.value.detail.lower()
 
 
-def test_create_job_invalid_model_id(client: TestClient, sample_image_bytes: bytes):
-    """Test that invalid model_id is rejected."""
-    response = client.post(
-        "/api/v1/jobs",
-        data={"model_id": "invalid_model_id"},
-        files={"image": ("test.png", io.BytesIO(sample_image_bytes), "image/png")}
+def test_validate_image_upload_rejects_missing_content_type():
+    """Test that uploads without a content type are rejected."""
+    upload = UploadFile(io.BytesIO(TINY_PNG), filename="test.png")
+    
+    with pytest.raises(HTTPException) as exc_info:
+        validate_image_upload(upload)
+    
+    assert exc_info.value.status_code == 400
+
+
+def test_validate_image_upload_accepts_image():
+    """Test that image uploads pass validation."""
+    upload = UploadFile(
+        io.BytesIO(TINY_PNG),
+        filename="test.png",
+        headers=Headers({"content-type": "image/png"}),
     )
     
-    assert response.status_code == 404
-    data = response.json()
-    assert "detail" in data
-    assert "not found" in data["detail"].lower()
+    validate_image_upload(upload)
 
 
-def test_create_job_valid(client: TestClient, sample_image_bytes: bytes):
-    """Test that valid image and model_id creates a job."""
-    response = client.post(
-        "/api/v1/jobs",
-        data={"model_id": "resnet18"},
-        files={"image": ("test.png", io.BytesIO(sample_image_bytes), "image/png")}
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("model_id,image,content_type,expected_status,expected_detail", [
+    (None, TINY_PNG, "image/png", 422, None),  # missing model_id form field
+    ("invalid_model_id", TINY_PNG, "image/png", 404, "not found"),
+    ("resnet18", b"This is not an image file", "text/plain", 400, "image"),
+    ("resnet18", None, "image/png", 200, None),  # None: upload sample_image_bytes
+])
+async def test_create_job(
+    async_client: httpx.AsyncClient,
+    sample_image_bytes: bytes,
+    model_id: Optional[str],
+    image: Optional[bytes],
+    content_type: str,
+    expected_status: int,
+    expected_detail: Optional[str],
+):
+    """Test that job creation accepts valid requests and rejects invalid ones."""
+    response = await post_job(
+        async_client,
+        image if image is not None else sample_image_bytes,
+        model_id=model_id,
+        content_type=content_type,
     )
     
-    assert response.status_code == 200
+    assert response.status_code == expected_status, response.text
     data = response.json()
-    assert "job_id" in data
-    assert "status" in data
-    assert "model_id" in data
-    assert data["model_id"] == "resnet18"
+    if expected_status == 200:
+        assert "job_id" in data
+        assert "status" in data
+        assert data["model_id"] == model_id
+    else:
+        assert "detail" in data
+    if expected_detail is not None:
+        assert expected_detail in data["detail"].lower()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("field,value,expected_status", [
+    ("top_k", "1", 200),
+    ("top_k", "5", 200),
+    ("top_k", "0", 400),
+    ("top_k", "6", 400),
+    ("top_k", "three", 422),
+    ("cam_layers", "layer3,layer4", 200),
+    ("cam_layers", " , ", 400),
+])
+async def test_create_job_option_validation(
+    async_client: httpx.AsyncClient, sample_image_bytes: bytes, field: str, value: str, expected_status: int
+):
+    """Test that the job options go through the endpoint's validation."""
+    response = await post_job(async_client, sample_image_bytes, **{field: value})
+    
+    assert response.status_code == expected_status, response.text
+    if expected_status == 400:
+        assert field in response.json()["detail"]
+
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_job_events_unknown_job(async_client: httpx.AsyncClient):
+    """Test that streaming events for an unknown job returns 404."""
+    response = await async_client.get("/api/v1/jobs/does-not-exist/events")
+    
+    assert response.status_code == 404
+    assert "not found" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_job_events_stream_until_done(async_client: httpx.AsyncClient, sample_image_bytes: bytes):
+    """Test that the event stream ends with a terminal job status."""
+    response = await post_job(async_client, sample_image_bytes)
+    job_id = response.json()["job_id"]
+    
+    response = await async_client.get(f"/api/v1/jobs/{job_id}/events")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events, "Expected at least one event"
+    assert all(event["job_id"] == job_id for event in events)
+    assert "result" not in events[-1]
+    assert events[-1]["status"] in ("succeeded", "failed")
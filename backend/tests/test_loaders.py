@@ -1,21 +1,28 @@
 """Unit tests for model loaders and preprocessing."""
 
+import functools
 import io
+from collections import OrderedDict
+
+import numpy as np
 import pytest
 import torch
 from PIL import Image
 
-from app.models.loaders import preprocess_image, load_model
+from app.core.config import settings
+from app.models import loaders
+from app.models.loaders import decode_image, get_cached_input, preprocess_image, load_model
 
 
+@functools.lru_cache(maxsize=8)
 def create_test_image_bytes(width: int = 256, height: int = 256) -> bytes:
-    """Create a simple test image as bytes."""
-    # Create a simple RGB image
-    image = Image.new("RGB", (width, height), color=(128, 128, 128))
+    """Create a simple test image as bytes (encoded once per size)."""
+    # Create a simple RGB image (mid-gray, filled with one memset)
+    image = Image.fromarray(np.full((height, width, 3), 128, dtype=np.uint8))
     
-    # Convert to bytes
+    # Convert to bytes (uncompressed BMP: these tests only check preprocessing output)
     buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
+    image.save(buffer, format="BMP")
     buffer.seek(0)
     return buffer.getvalue()
 
@@ -35,55 +42,167 @@ def test_preprocess_image_shape():
     assert tensor.dtype == torch.float32, f"Expected dtype float32, got {tensor.dtype}"
 
 
-def test_preprocess_image_different_sizes():
+@pytest.mark.parametrize("width,height", [
+    (500, 500),  # square
+    (800, 600),  # rectangular
+    (100, 100),  # smaller than the model input
+])
+def test_preprocess_image_different_sizes(width, height):
     """Test preprocessing with different input image sizes."""
-    # Test with square image
-    image_bytes_square = create_test_image_bytes(width=500, height=500)
-    tensor_square = preprocess_image(image_bytes_square, model_id="resnet18")
-    assert tensor_square.shape == (1, 3, 224, 224)
+    tensor = preprocess_image(create_test_image_bytes(width=width, height=height), model_id="resnet18")
+    assert tensor.shape == (1, 3, 224, 224)
+
+
+def test_preprocess_image_bytes_matches_decoded_tensor():
+    """Test that bytes and decoded-tensor inputs preprocess identically (both can fill the cache)."""
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (600, 800, 3), dtype=np.uint8)).save(
+        buffer, format="JPEG"
+    )
+    image_bytes = buffer.getvalue()
+    
+    from_bytes = preprocess_image(image_bytes, model_id="resnet18")
+    from_tensor = preprocess_image(decode_image(image_bytes), model_id="resnet18")
+    
+    assert torch.equal(from_bytes, from_tensor)
+
+
+def test_preprocess_image_cache_hit():
+    """Test that the same image_key returns the cached tensor without decoding again."""
+    tensor = preprocess_image(create_test_image_bytes(), model_id="resnet18", image_key="preproc-hit")
+    
+    assert get_cached_input("preproc-hit", "resnet18") is tensor
+    # A hit returns before decoding, so even undecodable bytes get the cached tensor
+    assert preprocess_image(b"not an image", model_id="resnet18", image_key="preproc-hit") is tensor
+
+
+def test_preprocess_image_cache_disabled(monkeypatch):
+    """Test that PREPROC_CACHE_MAX=0 disables the preprocessing cache."""
+    monkeypatch.setattr(settings, "PREPROC_CACHE_MAX", 0)
+    image_bytes = create_test_image_bytes()
     
-    # Test with rectangular image
-    image_bytes_rect = create_test_image_bytes(width=800, height=600)
-    tensor_rect = preprocess_image(image_bytes_rect, model_id="resnet18")
-    assert tensor_rect.shape == (1, 3, 224, 224)
+    first = preprocess_image(image_bytes, model_id="resnet18", image_key="preproc-off")
+    second = preprocess_image(image_bytes, model_id="resnet18", image_key="preproc-off")
     
-    # Test with smaller image
-    image_bytes_small = create_test_image_bytes(width=100, height=100)
-    tensor_small = preprocess_image(image_bytes_small, model_id="resnet18")
-    assert tensor_small.shape == (1, 3, 224, 224)
+    assert first is not second
+    assert torch.equal(first, second)
+    assert get_cached_input("preproc-off", "resnet18") is None
+
+
+@pytest.mark.parametrize("image_format,mode", [
+    ("JPEG", "RGB"),
+    ("PNG", "RGB"),
+    ("PNG", "RGBA"),
+    ("PNG", "L"),
+    ("PNG", "P"),
+    ("WEBP", "RGB"),
+    ("BMP", "RGB"),
+])
+def test_decode_image_formats(image_format, mode):
+    """Test that every supported format decodes to an RGB uint8 tensor."""
+    image = Image.new("RGB", (40, 30), color=(200, 100, 50)).convert(mode)
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    image_bytes = buffer.getvalue()
+
+    tensor = decode_image(image_bytes)
+
+    assert tensor.shape == (3, 30, 40), f"Expected shape [3, 30, 40], got {tensor.shape}"
+    assert tensor.dtype == torch.uint8, f"Expected dtype uint8, got {tensor.dtype}"
+
+    # Lossless formats must match PIL's own RGB conversion exactly
+    if image_format != "JPEG":
+        expected = torch.from_numpy(np.array(Image.open(io.BytesIO(image_bytes)).convert("RGB"))).permute(2, 0, 1)
+        assert torch.equal(tensor, expected)
+
+
+def test_decode_image_invalid_bytes():
+    """Test that undecodable bytes raise IOError."""
+    with pytest.raises(IOError):
+        decode_image(b"not an image")
 
 
 def test_load_model():
     """Test that model loading works and returns model in eval mode."""
+    # Load outside inference mode: the model is cached and shared with Grad-CAM tests,
+    # which need parameters that autograd can use
     model = load_model("resnet18")
     
-    # Verify it's a PyTorch module
-    assert isinstance(model, torch.nn.Module)
-    
-    # Verify it's in eval mode
-    assert not model.training, "Model should be in eval mode"
-    
-    # Verify it's on CPU
-    next_param = next(model.parameters())
-    assert next_param.device.type == "cpu", "Model should be on CPU"
+    # Serving runs under inference mode, so forward passes here don't build an autograd graph
+    with torch.inference_mode():
+        # Verify it's a PyTorch module
+        assert isinstance(model, torch.nn.Module)
+        
+        # Verify it's in eval mode
+        assert not model.training, "Model should be in eval mode"
+        
+        # Verify it's on CPU (resnet18's stem conv is a direct attribute, no parameter walk)
+        assert model.conv1.weight.device.type == "cpu", "Model should be on CPU"
+        
+        # Verify a forward pass produces ImageNet logits
+        output = model(torch.zeros(1, 3, 224, 224))
+        assert output.shape == (1, 1000), f"Expected shape [1, 1000], got {output.shape}"
 
 
-def test_load_model_caching():
+def test_load_model_caching(resnet18_model):
     """Test that models are cached and subsequent calls return same instance."""
-    model1 = load_model("resnet18")
-    model2 = load_model("resnet18")
+    model = load_model("resnet18")
+    
+    # Should be the session's warmed instance (cached)
+    assert model is resnet18_model, "Models should be cached and return same instance"
+
+
+@pytest.fixture
+def empty_model_cache(monkeypatch):
+    """Swap in an empty model cache so eviction tests don't touch the shared ResNet-18."""
+    monkeypatch.setattr(loaders, "_model_cache", OrderedDict())
+    monkeypatch.setattr(loaders, "_model_bytes", {})
+    monkeypatch.setattr(loaders, "_model_cache_bytes", 0)
+    monkeypatch.setattr(settings, "MODEL_CACHE_MAX", 10)
+
+
+def _cache_tiny_model(model_id: str) -> None:
+    """Cache a Linear(4, 4) (80 bytes of float32 weights and bias) and apply the limits."""
+    loaders._cache_model(model_id, torch.nn.Linear(4, 4))
+    loaders._evict_models()
+
+
+def test_model_cache_byte_limit_evicts_lru(empty_model_cache, monkeypatch):
+    """Test that MODEL_CACHE_MAX_BYTES evicts least recently used models first."""
+    monkeypatch.setattr(settings, "MODEL_CACHE_MAX_BYTES", 200)
+    
+    _cache_tiny_model("a")
+    _cache_tiny_model("b")
+    assert list(loaders._model_cache) == ["a", "b"]
     
-    # Should be the same instance (cached)
-    assert model1 is model2, "Models should be cached and return same instance"
+    # Re-caching "a" makes it the most recently used, so "b" is evicted for "c"
+    loaders._cache_model("a", loaders._model_cache["a"])
+    _cache_tiny_model("c")
+    
+    assert list(loaders._model_cache) == ["a", "c"]
+    assert loaders._model_cache_bytes == 160
+    assert set(loaders._model_bytes) == {"a", "c"}
 
 
-if __name__ == "__main__":
-    # Simple test runner for quick verification
-    print("Running preprocessing shape test...")
-    test_preprocess_image_shape()
-    print("✓ Preprocessing shape test passed!")
-    print("\nRunning preprocessing different sizes test...")
-    test_preprocess_image_different_sizes()
-    print("✓ Preprocessing different sizes test passed!")
-    print("\nAll tests passed!")
+def test_model_cache_keeps_most_recent_over_byte_limit(empty_model_cache, monkeypatch):
+    """Test that the most recently used model is kept even if it alone exceeds the byte limit."""
+    monkeypatch.setattr(settings, "MODEL_CACHE_MAX_BYTES", 50)
+    
+    _cache_tiny_model("a")
+    assert list(loaders._model_cache) == ["a"]
+    
+    _cache_tiny_model("b")
+    assert list(loaders._model_cache) == ["b"]
+    assert loaders._model_cache_bytes == 80
+
 
+def test_model_cache_count_limit(empty_model_cache, monkeypatch):
+    """Test that MODEL_CACHE_MAX bounds the number of cached models when bytes are unlimited."""
+    monkeypatch.setattr(settings, "MODEL_CACHE_MAX", 2)
+    monkeypatch.setattr(settings, "MODEL_CACHE_MAX_BYTES", 0)
+    
+    for model_id in ("a", "b", "c"):
+        _cache_tiny_model(model_id)
+    
+    assert list(loaders._model_cache) == ["b", "c"]
+    assert loaders._model_cache_bytes == 160
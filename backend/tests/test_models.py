@@ -1,15 +1,26 @@
 """Tests for models endpoint."""
 
+from typing import Any, Dict, List
+
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
 
+# Share the session event loop with the async_client fixture
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-def test_list_models(client: TestClient):
-    """Test that models endpoint returns list of models."""
-    response = client.get("/api/v1/models")
-    
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def models_json(async_client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+    """Fetch the model list once for this module."""
+    response = await async_client.get("/api/v1/models")
     assert response.status_code == 200
-    data = response.json()
+    return response.json()
+
+
+async def test_list_models(models_json: List[Dict[str, Any]]):
+    """Test that models endpoint returns list of models."""
+    data = models_json
     assert isinstance(data, list)
     assert len(data) > 0
     
@@ -20,9 +31,9 @@ def test_list_models(client: TestClient):
         assert "input_size" in model
 
 
-def test_get_model_config_valid(client: TestClient):
+async def test_get_model_config_valid(async_client: httpx.AsyncClient, models_json: List[Dict[str, Any]]):
     """Test getting model config for valid model_id."""
-    response = client.get("/api/v1/models/resnet18")
+    response = await async_client.get("/api/v1/models/resnet18")
     
     assert response.status_code == 200
     data = response.json()
@@ -31,14 +42,18 @@ def test_get_model_config_valid(client: TestClient):
     assert "input_size" in data
     assert "normalization" in data
     assert "layers_to_hook" in data
+    
+    # Full config must agree with its entry in the model list
+    listed = next(model for model in models_json if model["id"] == "resnet18")
+    assert data["display_name"] == listed["display_name"]
+    assert data["input_size"] == listed["input_size"]
 
 
-def test_get_model_config_invalid(client: TestClient):
+async def test_get_model_config_invalid(async_client: httpx.AsyncClient):
     """Test that invalid model_id returns 404."""
-    response = client.get("/api/v1/models/invalid_model_id")
+    response = await async_client.get("/api/v1/models/invalid_model_id")
     
     assert response.status_code == 404
     data = response.json()
     assert "detail" in data
     assert "not found" in data["detail"].lower()
-